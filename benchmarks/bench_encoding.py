@@ -0,0 +1,70 @@
+"""
+compare form_urlencoded and add_sid_token before and after the serializer layer, 10k file ids per request
+
+python benchmarks/bench_encoding.py
+"""
+import sys
+import urllib.parse
+from pathlib import Path
+from timeit import timeit
+
+import simplejson
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from synology_drive_api import serializers  # noqa: E402
+from synology_drive_api.base import add_sid_token  # noqa: E402
+from synology_drive_api.utils import form_urlencoded  # noqa: E402
+
+BATCH_SIZE = 10000
+SID = 'x' * 80
+FILE_IDS = [f"id:{552146100935505098 + i}" for i in range(BATCH_SIZE)]
+LABEL_DATA = {'files': FILE_IDS, 'labels': [{'action': 'add', 'label_id': '15'}],
+              'api': 'SYNO.SynologyDrive.Files', 'method': 'label', 'version': '2'}
+MOVE_DATA = {'api': 'SYNO.SynologyDrive.Files', 'method': 'move', 'version': 2, 'files': FILE_IDS,
+             'to_parent_folder': '/team-folders/archive', 'conflict_action': 'autorename'}
+
+
+def legacy_form_urlencoded(data: dict) -> str:
+    data_list = []
+    for key, value in data.items():
+        value_encode = urllib.parse.quote(simplejson.dumps(value) if not isinstance(value, str) else value, safe='')
+        data_list.append(f"{key}={value_encode}")
+    return '&'.join(data_list)
+
+
+def legacy_add_sid_token(reqs_data: dict, sid: str) -> dict:
+    if 'params' not in reqs_data:
+        reqs_data['params'] = {}
+    if 'api' not in reqs_data['params'] and 'api=' not in reqs_data.get('data', ''):
+        return reqs_data
+    if reqs_data['params'].get('api') != 'SYNO.API.Auth':
+        reqs_data['params']['_sid'] = sid
+    return reqs_data
+
+
+def report(name: str, func, number: int = 20) -> None:
+    print(f"{name:44} {timeit(func, number=number) / number * 1000:8.3f} ms/call")
+
+
+if __name__ == '__main__':
+    legacy_body = legacy_form_urlencoded(MOVE_DATA)
+    print(f"{BATCH_SIZE} file ids, body {len(legacy_body) / 1024:.0f} KiB")
+    report('legacy form_urlencoded (label)', lambda: legacy_form_urlencoded(LABEL_DATA))
+    report('legacy form_urlencoded (move)', lambda: legacy_form_urlencoded(MOVE_DATA))
+    for backend in ('simplejson', 'ujson', 'orjson'):
+        try:
+            serializers.set_json_backend(backend)
+        except KeyError:
+            print(f"{backend} is not installed, skipped")
+            continue
+        report(f'form_urlencoded {backend} (label)', lambda: form_urlencoded(LABEL_DATA))
+        report(f'form_urlencoded {backend} (move)', lambda: form_urlencoded(MOVE_DATA))
+    serializers.set_json_backend()
+
+    body = form_urlencoded(MOVE_DATA)
+    report('legacy add_sid_token (form body)', lambda: legacy_add_sid_token({'data': body}, SID), 200)
+    report('add_sid_token (form body)', lambda: add_sid_token({'data': body}, SID), 200)
+    params = {'api': 'SYNO.SynologyDrive.Files', 'method': 'list'}
+    report('legacy add_sid_token (params)', lambda: legacy_add_sid_token({'params': dict(params)}, SID), 200)
+    report('add_sid_token (params)', lambda: add_sid_token({'params': params}, SID), 200)
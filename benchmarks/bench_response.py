@@ -0,0 +1,78 @@
+"""
+compare response handling before and after parsing body once
+
+python benchmarks/bench_response.py
+"""
+import io
+import sys
+import tracemalloc
+from pathlib import Path
+from timeit import timeit
+
+import requests
+import simplejson
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from synology_drive_api.base import raise_synology_exception  # noqa: E402
+
+ITEM_COUNT = 10000
+BINARY_SIZE = 32 * 1024 ** 2
+JSON_BODY = simplejson.dumps({'success': True, 'data': {'total': ITEM_COUNT, 'items': [
+    {'file_id': str(552146100935505098 + i), 'name': f'file_{i}.xlsx', 'display_path': f'/mydrive/file_{i}.xlsx',
+     'type': 'file', 'size': 1024 * i, 'modified_time': 1600000000 + i, 'labels': []}
+    for i in range(ITEM_COUNT)]}}).encode('utf-8')
+BINARY_BODY = b'\0' * BINARY_SIZE
+
+
+def make_response(body: bytes, content_type: str = 'application/json', stream: bool = False) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = 200
+    resp.headers['Content-Type'] = content_type
+    if stream:
+        resp.raw = io.BytesIO(body)
+    else:
+        resp._content = body
+    return resp
+
+
+def legacy_json(resp: requests.Response) -> dict:
+    # error check decoded text and parsed json, _request decoded and parsed again
+    result = resp.json() if resp.text else {}
+    if not result['success']:
+        raise ValueError(result)
+    return resp.json() if resp.text else {}
+
+
+def current_json(resp: requests.Response) -> dict:
+    return raise_synology_exception(resp)
+
+
+def legacy_binary(resp: requests.Response) -> int:
+    return len(io.BytesIO(resp.content).getvalue())
+
+
+def current_stream(resp: requests.Response) -> int:
+    # download_file(stream=True), body is read chunk by chunk
+    raise_synology_exception(resp, bio_exist=True)
+    return sum(len(chunk) for chunk in iter(lambda: resp.raw.read(1024 * 1024), b''))
+
+
+def measure(name: str, func, make, number: int) -> None:
+    seconds = timeit(lambda: func(make()), number=number) / number
+    tracemalloc.start()
+    func(make())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{name:32} {seconds * 1000:8.2f} ms/call  peak {peak / 1024 ** 2:8.2f} MiB")
+
+
+if __name__ == '__main__':
+    print(f"json list response, {ITEM_COUNT} items, {len(JSON_BODY) / 1024 ** 2:.1f} MiB")
+    measure('legacy text + json twice', legacy_json, lambda: make_response(JSON_BODY), 20)
+    measure('current parse once', current_json, lambda: make_response(JSON_BODY), 20)
+    print(f"binary download, {BINARY_SIZE / 1024 ** 2:.0f} MiB, body already received")
+    measure('legacy content + BytesIO', legacy_binary,
+            lambda: make_response(BINARY_BODY, 'application/octet-stream', stream=True), 5)
+    measure('current stream', current_stream,
+            lambda: make_response(BINARY_BODY, 'application/octet-stream', stream=True), 5)
@@ -1,12 +1,17 @@
 import functools
+import io
+import threading
 from http import cookiejar
 from time import sleep
 from urllib.parse import urlparse
 
 import requests
-import simplejson as json
 import urllib3
-from typing import Optional, Union
+from typing import Optional, Union, List
+
+from synology_drive_api import serializers
+from synology_drive_api.trace import ReplayAdapter, TraceRecorder
+from synology_drive_api.utils import form_urlencoded
 
 # Used for verify=False in requests
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -69,29 +74,28 @@ def concat_nas_address(ip_address: Optional[str] = None,
 
 def add_sid_token(reqs_data: dict, sid: str) -> dict:
     """
-    add sid token in requests params
+    add sid token in requests params, reqs_data and its params are not modified
     :param reqs_data: requests kwargs
     :param sid: sid token
-    :return:
+    :return: new requests kwargs
     """
-    if 'params' not in reqs_data:
-        reqs_data['params'] = {}
+    params = reqs_data.get('params', {})
 
     # api params may in forms sometimes
-    if 'api' not in reqs_data['params'] and 'api=' not in reqs_data.get('data', ''):
-        return reqs_data
+    if 'api' not in params and 'api=' not in reqs_data.get('data', ''):
+        return {**reqs_data, 'params': params}
 
     # login logout don't need sid
-    if reqs_data['params'].get('api') != 'SYNO.API.Auth':
-        reqs_data['params']['_sid'] = sid
-    return reqs_data
+    if params.get('api') == 'SYNO.API.Auth':
+        return {**reqs_data, 'params': params}
+    return {**reqs_data, 'params': {**params, '_sid': sid}}
 
 
-def raise_synology_exception(resp, bio_exist: bool = False) -> None:
+def raise_synology_exception(resp, bio_exist: bool = False) -> Optional[dict]:
     """
     :param resp:
     :param bio_exist: indicate response contains binary object
-    :return:
+    :return: parsed json body, None if response contains binary object
     """
     # handle 404, 400, ..., and synology server error code
     try:
@@ -99,9 +103,9 @@ def raise_synology_exception(resp, bio_exist: bool = False) -> None:
     except requests.RequestException as reqe:
         code = -1
         message = None
-        if reqe.response.text:
+        if reqe.response.content:
             try:
-                err_info = json.loads(reqe.response.text)
+                err_info = serializers.loads(reqe.response.content)
                 code = err_info['code']
                 message = err_info['message']
             except (ValueError, KeyError):
@@ -113,16 +117,27 @@ def raise_synology_exception(resp, bio_exist: bool = False) -> None:
             response=reqe.response
         )
 
-    if resp.status_code == 200 and not bio_exist:
-        result = resp.json() if resp.text else {}
-        if not result['success']:
-            raise SynologyException(
-                code=result['error']['code'],
-                # sometimes there is no 'errors' key
-                message=result['error'].get('errors') if result['error'].get('errors') else result['error'],
-                request=resp.request,
-                response=resp
-            )
+    if bio_exist:
+        return None
+    if not resp.content:
+        return {}
+    if resp.status_code != 200:
+        # other 2xx, 3xx responses may not be json
+        try:
+            return serializers.loads(resp.content)
+        except ValueError:
+            return {}
+    # parse body bytes once, skip text decoding and encoding detection
+    result = serializers.loads(resp.content)
+    if result and not result['success']:
+        raise SynologyException(
+            code=result['error']['code'],
+            # sometimes there is no 'errors' key
+            message=result['error'].get('errors') if result['error'].get('errors') else result['error'],
+            request=resp.request,
+            response=resp
+        )
+    return result
 
 
 class SynologySession:
@@ -136,11 +151,13 @@ class SynologySession:
     _base_url: str
     # sid token
     _sid: Optional[str] = None
-    req_session: requests.Session = requests.Session()
+    req_session: requests.Session
     _session_expire: bool = True
     # dsm version, used for login api version
     dsm_version: str = '6'
     max_retry: int = 2
+    # record every response into trace file, disabled if None
+    trace_recorder: Optional[TraceRecorder] = None
 
     def __init__(self,
                  username: str,
@@ -160,6 +177,10 @@ class SynologySession:
         self._otp_code = otp_code
         self.dsm_version = dsm_version
         self._base_url = f"{nas_address}/webapi/"
+        # single flight login, logout
+        self._login_lock = threading.Lock()
+        # own session, transport adapters are mounted per client
+        self.req_session = requests.Session()
         self.req_session.cookies.set_policy(BlockAll())
         self.max_retries = max_retry
 
@@ -179,12 +200,7 @@ class SynologySession:
         kwargs = add_sid_token(kwargs, self._sid)
 
         if isinstance(kwargs.get('data', ''), dict):
-            body = json.dumps(
-                kwargs['data'],
-                ensure_ascii=False,
-            )
-            body = body.encode('utf-8')
-            kwargs['data'] = body
+            kwargs['data'] = serializers.dumps(kwargs['data'])
         elif isinstance(kwargs.get('data'), str):
             kwargs['data'] = kwargs['data'].encode('utf-8')
 
@@ -196,21 +212,13 @@ class SynologySession:
             kwargs['verify'] = False
         bio_flag = kwargs.pop('bio') if 'bio' in kwargs else None
         if not self.max_retries:
-            res = self.req_session.request(
-                method=method,
-                url=url,
-                **kwargs
-            )
-            raise_synology_exception(res, bio_exist=bio_flag)
+            res = self._send(method, url, **kwargs)
+            result = raise_synology_exception(res, bio_exist=bio_flag)
         else:
             for retry in range(self.max_retries):
                 try:
-                    res = self.req_session.request(
-                        method=method,
-                        url=url,
-                        **kwargs
-                    )
-                    raise_synology_exception(res, bio_exist=bio_flag)
+                    res = self._send(method, url, **kwargs)
+                    result = raise_synology_exception(res, bio_exist=bio_flag)
                     break
                 except SynologyException as e:
                     # retry
@@ -225,10 +233,57 @@ class SynologySession:
                     else:
                         raise e
         if bio_flag:
+            if kwargs.get('stream'):
+                # file-like body, read by caller chunk by chunk
+                res.raw.decode_content = True
+                return res.raw
             return res.content
-        result = res.json() if res.text else {}
         return result
 
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        res = self.req_session.request(
+            method=method,
+            url=url,
+            **kwargs
+        )
+        # read once, recording may be stopped by another thread
+        trace_recorder = self.trace_recorder
+        if trace_recorder is not None:
+            trace_recorder.record(res)
+            if kwargs.get('stream'):
+                # recorder has read the body, serve it as stream again
+                res.raw = io.BytesIO(res.content)
+        return res
+
+    def start_recording(self, trace_path: str) -> TraceRecorder:
+        """
+        record every request and response into gzip trace file, sid and password are redacted.
+        Running recording is stopped first.
+        :param trace_path: such as 'drive_trace.jsonl.gz'
+        :return:
+        """
+        trace_recorder, self.trace_recorder = self.trace_recorder, TraceRecorder(trace_path)
+        if trace_recorder is not None:
+            trace_recorder.close()
+        return self.trace_recorder
+
+    def stop_recording(self) -> None:
+        trace_recorder, self.trace_recorder = self.trace_recorder, None
+        if trace_recorder is not None:
+            trace_recorder.close()
+
+    def replay(self, trace_path: str, speed: Optional[float] = None) -> ReplayAdapter:
+        """
+        serve requests from trace file instead of nas
+        :param trace_path: trace file of start_recording
+        :param speed: 1 to replay at recorded speed, 10 to replay 10 times faster, None to replay without waiting
+        :return:
+        """
+        adapter = ReplayAdapter(trace_path, speed)
+        self.req_session.mount('http://', adapter)
+        self.req_session.mount('https://', adapter)
+        return adapter
+
     def http_get(self, endpoint: str, **kwargs):
         return self._request('get', endpoint, **kwargs)
 
@@ -241,51 +296,112 @@ class SynologySession:
     def http_delete(self, endpoint: str, **kwargs):
         return self._request('delete', endpoint, **kwargs)
 
-    def login(self, application: str):
+    def login(self, application: str, timeout: Optional[float] = None):
+        """
+        :param application: session name
+        :param timeout: seconds to wait for nas, wait forever if None
+        :return:
+        """
+        # concurrent callers wait for the first login and reuse its sid
+        with self._login_lock:
+            if not self._session_expire and self._sid is not None:
+                return 'User already logged'
+            self._new_session(application, timeout)
+            return 'User logging... New session started!'
+
+    def relogin(self, application: str, stale_sid: Optional[str], timeout: Optional[float] = None) -> bool:
+        """
+        start a new session if sid is still the one rejected by nas, sid isn't dropped while logging in
+        :param application: session name
+        :param stale_sid: sid sent with the rejected request, may be None
+        :param timeout: seconds to wait for nas, wait forever if None
+        :return: False if another caller has replaced stale sid already
+        """
+        with self._login_lock:
+            if self._sid != stale_sid:
+                return False
+            self._new_session(application, timeout)
+            return True
+
+    def _new_session(self, application: str, timeout: Optional[float]) -> None:
+        """
+        login request, caller holds _login_lock
+        """
         endpoint = 'auth.cgi'
         login_api_version = '2' if self.dsm_version == '6' else '3'
         params = {'api': 'SYNO.API.Auth', 'version': login_api_version, 'method': 'login', 'account': self._username,
                   'passwd': self._password, 'session': application, 'format': 'cookie'}
         if self._otp_code is not None:
             params['otp_code'] = self._otp_code
+        resp = self.http_get(
+            endpoint,
+            params=params,
+            timeout=timeout
+        )
+        self._sid = resp['data']['sid']
+        self._session_expire = False
 
-        if not self._session_expire:
-            if self._sid is not None:
-                self._session_expire = False
-                return 'User already logged'
-        else:
-            resp = self.http_get(
-                endpoint,
-                params=params
-            )
-            self._sid = resp['data']['sid']
+    def resume(self, sid: str) -> None:
+        """
+        reuse sid of a previous login
+        :param sid: sid token
+        """
+        with self._login_lock:
+            self._sid = sid
             self._session_expire = False
-            return 'User logging... New session started!'
+
+    def expire(self) -> None:
+        """
+        drop sid, next login starts a new session
+        """
+        with self._login_lock:
+            self._sid = None
+            self._session_expire = True
 
     def logout(self, application: str):
         endpoint = 'auth.cgi'
         logout_api_version = '2' if self.dsm_version == '6' else '3'
         params = {'api': 'SYNO.API.Auth', 'version': logout_api_version, 'method': 'logout', 'session': application}
-        resp = self.http_get(
-            endpoint,
-            params=params
-        )
-        if resp['success'] is True:
+        with self._login_lock:
+            resp = self.http_get(
+                endpoint,
+                params=params
+            )
             self._session_expire = True
             self._sid = None
+        if resp['success'] is True:
             return 'Logged out'
         else:
-            self._session_expire = True
-            self._sid = None
             return 'No valid session is open'
 
+    def compound_request(self, compound: List[dict], mode: str = 'parallel', stop_when_error: bool = False) -> dict:
+        """
+        send multiple api calls in one request
+        :param compound: [{"api": "SYNO.SynologyDrive.Files", "method": "get", "version": 3, "path": ...}, ...]
+        :param mode: 'parallel' or 'sequential'
+        :param stop_when_error:
+        :return: results are in resp['data']['result'], same order as compound
+        """
+        endpoint = 'entry.cgi'
+        data = {
+            'stop_when_error': stop_when_error,
+            'mode': mode,
+            'api': 'SYNO.Entry.Request',
+            'compound': compound,
+            'method': 'request',
+            'version': 1
+        }
+        urlencoded_data = form_urlencoded(data)
+        return self.http_post(endpoint, data=urlencoded_data)
+
     @functools.lru_cache()
-    def get_api_list(self, app=None):
+    def get_api_list(self, app=None, timeout: Optional[float] = None):
         endpoint = 'query.cgi'
         params = {'api': 'SYNO.API.Info', 'version': '1', 'method': 'query', 'query': 'all'}
         resp = self.http_get(
             endpoint,
-            params=params
+            params=params,
+            timeout=timeout
         )
         if app is not None:
             for key in resp['data']:
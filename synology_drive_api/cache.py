@@ -0,0 +1,171 @@
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Union
+
+
+class DownloadCache:
+    """
+    Size bounded LRU disk cache of downloaded file content, keyed by file_id and revision
+    """
+
+    def __init__(self, cache_dir: Union[str, Path], max_bytes: int = 1024 ** 3) -> None:
+        """
+        :param cache_dir: cache folder, existing cached files are reused
+        :param max_bytes: least recently used files are evicted when total size exceeds max_bytes
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        # key: size, in least recently used order
+        self._entries: OrderedDict = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        cached_files = sorted((entry for entry in os.scandir(self.cache_dir)
+                               if entry.is_file() and not entry.name.endswith('.tmp')),
+                              key=lambda entry: entry.stat().st_mtime)
+        for entry in cached_files:
+            self._entries[entry.name] = entry.stat().st_size
+            self._size += entry.stat().st_size
+        self._evict()
+
+    @staticmethod
+    def make_key(file_info: dict) -> str:
+        """
+        :param file_info: get_file_or_folder_info(...)['data']
+        :return: cache key, changes when file changes
+        """
+        return f"{file_info['file_id']}_{file_info['revisions']}_{file_info.get('modified_time', 0)}"
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        :param key: cache key
+        :return: cached content, None if not cached
+        """
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+        try:
+            content = (self.cache_dir / key).read_bytes()
+            # touch file, keep lru order after restart
+            os.utime(self.cache_dir / key)
+        except FileNotFoundError:
+            # evicted by another thread
+            with self._lock:
+                self._size -= self._entries.pop(key, 0)
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += len(content)
+        return content
+
+    def put(self, key: str, content: bytes) -> None:
+        """
+        :param key: cache key
+        :param content: file content
+        """
+        if len(content) > self.max_bytes:
+            return
+        tmp_path = self._tmp_path(key)
+        tmp_path.write_bytes(content)
+        self._add(key, tmp_path, len(content))
+
+    def tee(self, key: str, body) -> 'CacheTee':
+        """
+        cache streamed content while caller reads it
+        :param key: cache key
+        :param body: file-like response body
+        :return: file-like body, content is cached when it is read to the end
+        """
+        return CacheTee(self, key, body)
+
+    def _tmp_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.{threading.get_ident()}.tmp"
+
+    def _add(self, key: str, tmp_path: Path, size: int) -> None:
+        os.replace(tmp_path, self.cache_dir / key)
+        with self._lock:
+            self._size += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            while self._entries:
+                self._remove_oldest()
+
+    def _evict(self) -> None:
+        while self._size > self.max_bytes and self._entries:
+            self._remove_oldest()
+
+    def _remove_oldest(self) -> None:
+        key, size = self._entries.popitem(last=False)
+        self._size -= size
+        try:
+            (self.cache_dir / key).unlink()
+        except FileNotFoundError:
+            pass
+
+
+class CacheTee:
+    """
+    streamed download body, content is written to a cache temp file while it is read.
+    Content is cached once body is read to the end, dropped if body is closed before or exceeds max_bytes.
+    """
+
+    def __init__(self, cache: DownloadCache, key: str, body) -> None:
+        self._cache = cache
+        self._key = key
+        self._body = body
+        # same file may be streamed twice at once
+        fd, tmp_path = tempfile.mkstemp(suffix='.tmp', prefix=f"{key}.", dir=cache.cache_dir)
+        self._tmp_path = Path(tmp_path)
+        self._tmp = os.fdopen(fd, 'wb')
+        self._size = 0
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        chunk = self._body.read(size)
+        if self._tmp is None:
+            return chunk
+        self._size += len(chunk)
+        if self._size > self._cache.max_bytes:
+            self._discard()
+            return chunk
+        self._tmp.write(chunk)
+        if size is None or size < 0 or not chunk and size != 0:
+            # end of body
+            self._tmp.close()
+            self._tmp = None
+            self._cache._add(self._key, self._tmp_path, self._size)
+        return chunk
+
+    def close(self) -> None:
+        self._body.close()
+        self._discard()
+
+    def _discard(self) -> None:
+        if self._tmp is None:
+            return
+        self._tmp.close()
+        self._tmp = None
+        try:
+            os.unlink(self._tmp_path)
+        except FileNotFoundError:
+            pass
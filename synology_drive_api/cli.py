@@ -0,0 +1,377 @@
+"""
+synology-drive command line tool
+
+Login info is read from options or environment variables:
+SYNOLOGY_DRIVE_USER, SYNOLOGY_DRIVE_PASSWORD, SYNOLOGY_DRIVE_ADDRESS, SYNOLOGY_DRIVE_PORT,
+SYNOLOGY_DRIVE_HTTP, SYNOLOGY_DRIVE_DSM_VERSION
+"""
+import argparse
+import os
+import sys
+import threading
+from time import monotonic
+from typing import Callable, List, Optional
+
+# sid is reused by later commands
+SESSION_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'synology-drive-api', 'sessions.json')
+# sid expired, timeout, not found
+SESSION_ERROR_CODES = (105, 106, 107, 119)
+UPLOAD_INDEX_PATH = os.path.join(os.path.dirname(SESSION_CACHE_PATH), 'upload_index')
+CHUNK_SIZE = 1024 * 1024
+
+
+class NamedFile:
+    """
+    local file uploaded with another name, bytes read are reported to progress
+    """
+
+    def __init__(self, file, name: str, progress: Optional['Progress'] = None, unreported: int = 0) -> None:
+        self._file = file
+        self.name = name
+        self._progress = progress
+        # file may be read more than once by dedup hashing and retries, report every byte once
+        self.unreported = unreported
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._file.read(size)
+        if self._progress is not None and self.unreported:
+            reported = min(len(chunk), self.unreported)
+            self.unreported -= reported
+            self._progress.advance(reported)
+        return chunk
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return self._file.seek(offset, whence)
+
+
+class Progress:
+    """
+    thread safe transfer progress, throughput and eta are printed to stderr
+    """
+
+    def __init__(self, total_files: int, total_bytes: int = 0, interval: float = 0.2) -> None:
+        self.total_files = total_files
+        self.total_bytes = total_bytes
+        self.done_files = 0
+        self.done_bytes = 0
+        self.interval = interval
+        self._start = monotonic()
+        self._printed_at = 0.0
+        self._lock = threading.Lock()
+
+    def advance(self, byte_count: int = 0, file_count: int = 0) -> None:
+        with self._lock:
+            self.done_bytes += byte_count
+            self.done_files += file_count
+            now = monotonic()
+            if now - self._printed_at >= self.interval or self.done_files == self.total_files:
+                self._printed_at = now
+                self._print(now - self._start)
+
+    def _print(self, elapsed: float) -> None:
+        rate = self.done_bytes / elapsed if elapsed else 0.0
+        if self.total_bytes and rate:
+            eta = f"{max(self.total_bytes - self.done_bytes, 0) / rate:.0f}s"
+        else:
+            eta = '-'
+        sys.stderr.write(f"\r{self.done_files}/{self.total_files} files  {self.done_bytes / CHUNK_SIZE:.1f} MiB  "
+                         f"{rate / CHUNK_SIZE:.1f} MiB/s  ETA {eta}   ")
+        if self.done_files == self.total_files:
+            sys.stderr.write('\n')
+        sys.stderr.flush()
+
+
+def load_cached_sid(cache_key: str) -> Optional[str]:
+    import json
+
+    try:
+        with open(SESSION_CACHE_PATH) as f:
+            return json.load(f).get(cache_key)
+    except (OSError, ValueError):
+        return None
+
+
+def save_cached_sid(cache_key: str, sid: str) -> None:
+    import json
+
+    try:
+        with open(SESSION_CACHE_PATH) as f:
+            sessions = json.load(f)
+    except (OSError, ValueError):
+        sessions = {}
+    sessions[cache_key] = sid
+    os.makedirs(os.path.dirname(SESSION_CACHE_PATH), exist_ok=True)
+    # sid is a credential, only readable by owner
+    fd = os.open(SESSION_CACHE_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w') as f:
+        json.dump(sessions, f)
+
+
+def connect(args, cache_key: str):
+    """
+    :param args: parsed arguments
+    :param cache_key: key of cached sid
+    :return: SynologyDrive, logged in or resumed from cached sid
+    """
+    from synology_drive_api.drive import SynologyDrive
+
+    if not args.user or not args.password or not args.address:
+        sys.exit('user, password and address are required, see synology-drive --help')
+    address_is_ip = args.address.replace('.', '').isdigit()
+    drive = SynologyDrive(args.user, args.password,
+                          ip_address=args.address if address_is_ip else None,
+                          port=args.port if address_is_ip else None,
+                          nas_domain=None if address_is_ip else args.address,
+                          https=not args.http, dsm_version=args.dsm_version)
+    sid = load_cached_sid(cache_key)
+    if sid:
+        drive.session.resume(sid)
+    else:
+        login(drive, cache_key, None)
+    return drive
+
+
+def login(drive, cache_key: str, stale_sid: Optional[str]) -> None:
+    """
+    start a new session and cache its sid
+    :param stale_sid: sid rejected by nas, None if not logged in. Skip login if another worker has replaced it
+    """
+    if drive.relogin(stale_sid):
+        save_cached_sid(cache_key, drive.session.sid)
+
+
+def run_with_session(drive, cache_key: str, command: Callable):
+    """
+    run command, login again if cached sid is expired
+    """
+    from synology_drive_api.base import SynologyException
+
+    sid = drive.session.sid
+    try:
+        return command()
+    except SynologyException as e:
+        if e.code not in SESSION_ERROR_CODES:
+            raise
+    login(drive, cache_key, sid)
+    return command()
+
+
+def walk(drive, remote_path: str, recursive: bool):
+    """
+    :return: item generator, sub folders are listed if recursive
+    """
+    folders = [remote_path]
+    while folders:
+        folder = folders.pop()
+        for item in drive.iter_folder(folder):
+            yield item
+            if recursive and item.get('type') == 'dir':
+                folders.append(item['display_path'])
+
+
+def remote_size(drive, remote_paths: List[str], chunk_size: int = 500) -> int:
+    """
+    total size of remote files, one compound info request per chunk, missing files are counted as 0
+    """
+    from synology_drive_api.utils import chunks
+
+    total = 0
+    for chunk in chunks(remote_paths, chunk_size):
+        compound = [{'api': 'SYNO.SynologyDrive.Files', 'method': 'get', 'version': 3,
+                     'path': f"id:{path}" if path.isdigit() else path} for path in chunk]
+        resp = drive.session.compound_request(compound)
+        total += sum(result['data'].get('size') or 0 for result in resp['data']['result'] if result['success'])
+    return total
+
+
+def download_to(drive, remote_path: str, local_path: str, progress: Progress) -> None:
+    body = drive.download_file(remote_path, stream=True)
+    if os.path.isdir(local_path):
+        local_path = os.path.join(local_path, body.name)
+    tmp_path = f"{local_path}.part"
+    try:
+        with open(tmp_path, 'wb') as f:
+            for chunk in iter(lambda: body.read(CHUNK_SIZE), b''):
+                f.write(chunk)
+                progress.advance(len(chunk))
+    finally:
+        body.close()
+    os.replace(tmp_path, local_path)
+    progress.advance(file_count=1)
+
+
+def run_parallel(drive, args, task: Callable, items: List) -> int:
+    """
+    run task for every item in args.jobs workers, sid expired while running is renewed once for all workers
+    :return: failed count
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    failed = 0
+    with ThreadPoolExecutor(max_workers=args.jobs) as executor:
+        futures = {executor.submit(run_with_session, drive, args.cache_key, lambda item=item: task(item)): item
+                   for item in items}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                failed += 1
+                sys.stderr.write(f"\nfailed {futures[future]}: {e}\n")
+    return failed
+
+
+def cmd_ls(drive, args) -> int:
+    for item in walk(drive, args.path, args.recursive):
+        if args.long:
+            print(f"{item.get('type', ''):4}  {item.get('size', 0):>12}  {item.get('modified_time', 0):>10}  "
+                  f"{item['display_path']}")
+        else:
+            print(item['display_path'])
+    return 0
+
+
+def cmd_get(drive, args) -> int:
+    if len(args.remote) > 1:
+        os.makedirs(args.local, exist_ok=True)
+    progress = Progress(len(args.remote), remote_size(drive, args.remote))
+    failed = run_parallel(drive, args, lambda remote: download_to(drive, remote, args.local, progress), args.remote)
+    return 1 if failed else 0
+
+
+def cmd_put(drive, args) -> int:
+    unreported = {path: os.path.getsize(path) for path in args.local}
+    progress = Progress(len(args.local), sum(unreported.values()))
+
+    def upload(local_path: str) -> None:
+        # file is streamed, progress moves while uploading
+        with open(local_path, 'rb') as f:
+            file = NamedFile(f, os.path.basename(local_path), progress, unreported[local_path])
+            try:
+                drive.upload_file(file, args.remote, conflict_action=args.conflict_action, dedup=args.dedup,
+                                  stream=True)
+            finally:
+                unreported[local_path] = file.unreported
+        progress.advance(file.unreported, 1)
+
+    if not args.dedup:
+        failed = run_parallel(drive, args, upload, args.local)
+        return 1 if failed else 0
+
+    import shelve
+
+    # keep upload index between runs, shelve isn't thread safe, workers use a dict copy
+    os.makedirs(os.path.dirname(UPLOAD_INDEX_PATH), exist_ok=True)
+    with shelve.open(UPLOAD_INDEX_PATH) as upload_index:
+        drive.upload_index = dict(upload_index)
+        failed = run_parallel(drive, args, upload, args.local)
+        upload_index.update(drive.upload_index)
+    return 1 if failed else 0
+
+
+def cmd_mirror(drive, args) -> int:
+    remote_root = args.remote.rstrip('/')
+    downloads = []
+    total_bytes = 0
+    for item in walk(drive, remote_root, recursive=True):
+        relative_path = item['display_path'][len(remote_root):].lstrip('/')
+        local_path = os.path.join(args.local, relative_path)
+        if item.get('type') == 'dir':
+            os.makedirs(local_path, exist_ok=True)
+            continue
+        # office files are exported, always download them
+        if not local_path.endswith(('.osheet', '.odoc')):
+            try:
+                stat = os.stat(local_path)
+                if stat.st_size == item.get('size') and stat.st_mtime >= item.get('modified_time', 0):
+                    continue
+            except OSError:
+                pass
+        downloads.append((item['display_path'], os.path.dirname(local_path) or '.'))
+        total_bytes += item.get('size') or 0
+    os.makedirs(args.local, exist_ok=True)
+    progress = Progress(len(downloads), total_bytes)
+    failed = run_parallel(drive, args, lambda download: download_to(drive, *download, progress), downloads)
+    return 1 if failed else 0
+
+
+def cmd_label(drive, args) -> int:
+    drive.manage_path_label(args.action, args.path, args.label)
+    return 0
+
+
+def cmd_convert(drive, args) -> int:
+    progress = Progress(len(args.path))
+
+    def convert(path: str) -> None:
+        drive.convert_to_online_office(path, delete_original_file=not args.keep_original,
+                                       conflict_action=args.conflict_action)
+        progress.advance(file_count=1)
+
+    failed = run_parallel(drive, args, convert, args.path)
+    return 1 if failed else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    env = os.environ.get
+    parser = argparse.ArgumentParser(prog='synology-drive', description='Synology Drive command line tool')
+    parser.add_argument('--user', default=env('SYNOLOGY_DRIVE_USER'))
+    parser.add_argument('--password', default=env('SYNOLOGY_DRIVE_PASSWORD'))
+    parser.add_argument('--address', default=env('SYNOLOGY_DRIVE_ADDRESS'), help='nas ip or drive domain')
+    parser.add_argument('--port', default=env('SYNOLOGY_DRIVE_PORT'))
+    parser.add_argument('--http', action='store_true', default=bool(env('SYNOLOGY_DRIVE_HTTP')),
+                        help='use http instead of https')
+    parser.add_argument('--dsm-version', default=env('SYNOLOGY_DRIVE_DSM_VERSION', '6'), choices=('6', '7'))
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    ls_parser = subparsers.add_parser('ls', help='list folder')
+    ls_parser.add_argument('path')
+    ls_parser.add_argument('-R', '--recursive', action='store_true')
+    ls_parser.add_argument('-l', '--long', action='store_true', help='show type, size and modified time')
+    ls_parser.set_defaults(handler=cmd_ls)
+
+    get_parser = subparsers.add_parser('get', help='download files')
+    get_parser.add_argument('remote', nargs='+')
+    get_parser.add_argument('local', help='local file or folder')
+    get_parser.set_defaults(handler=cmd_get)
+
+    put_parser = subparsers.add_parser('put', help='upload files')
+    put_parser.add_argument('local', nargs='+')
+    put_parser.add_argument('remote', help='drive folder')
+    put_parser.add_argument('--conflict-action', default='version', choices=('version', 'autorename'))
+    put_parser.add_argument('--dedup', action='store_true', help='skip files identical to last upload')
+    put_parser.set_defaults(handler=cmd_put)
+
+    mirror_parser = subparsers.add_parser('mirror', help='download changed files of drive folder recursively')
+    mirror_parser.add_argument('remote')
+    mirror_parser.add_argument('local')
+    mirror_parser.set_defaults(handler=cmd_mirror)
+
+    label_parser = subparsers.add_parser('label', help='add or delete label of files')
+    label_parser.add_argument('action', choices=('add', 'delete'))
+    label_parser.add_argument('label')
+    label_parser.add_argument('path', nargs='+')
+    label_parser.set_defaults(handler=cmd_label)
+
+    convert_parser = subparsers.add_parser('convert', help='convert xlsx/docx to synology office files')
+    convert_parser.add_argument('path', nargs='+')
+    convert_parser.add_argument('--keep-original', action='store_true')
+    convert_parser.add_argument('--conflict-action', default='autorename', choices=('version', 'autorename'))
+    convert_parser.set_defaults(handler=cmd_convert)
+
+    for transfer_parser in (get_parser, put_parser, mirror_parser, convert_parser):
+        transfer_parser.add_argument('-j', '--jobs', type=int, default=4, help='parallel workers')
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    args.cache_key = f"{args.user}@{args.address}"
+    drive = connect(args, args.cache_key)
+    return run_with_session(drive, args.cache_key, lambda: args.handler(drive, args))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,6 +1,8 @@
+import threading
 from typing import Optional, Union
 
 from synology_drive_api.base import SynologySession
+from synology_drive_api.cache import DownloadCache
 from synology_drive_api.files import FilesMixin
 from synology_drive_api.labels import LabelsMixin
 from synology_drive_api.tasks import TasksMixin
@@ -11,6 +13,13 @@ class SynologyDrive(LabelsMixin, FilesMixin, TasksMixin):
     session: SynologySession
     # if you need multiple login session and label functions, disable label cache. Default behavior is enabling cache.
     enable_label_cache: bool
+    # upload dedup index {drive_path: {'hash', 'size', 'file_id', 'modified_time'}}, can be a persistent mapping
+    upload_index: dict
+    # disk cache of downloaded content, disabled if None
+    download_cache: Optional[DownloadCache]
+    # dedup metrics
+    dedup_skipped_files: int = 0
+    dedup_skipped_bytes: int = 0
 
     def __init__(self,
                  username: str,
@@ -22,10 +31,17 @@ class SynologyDrive(LabelsMixin, FilesMixin, TasksMixin):
                  enable_label_cache: bool = True,
                  dsm_version: str = '6',
                  max_retry: int = 2,
-                 otp_code: Optional[str] = None) -> None:
+                 otp_code: Optional[str] = None,
+                 upload_index: Optional[dict] = None,
+                 download_cache: Optional[DownloadCache] = None) -> None:
         self.session = SynologySession(username, password, ip_address, port, nas_domain, https, dsm_version, max_retry,
                                        otp_code)
         self.enable_label_cache = enable_label_cache
+        self._label_dict = {}
+        self._label_lock = threading.Lock()
+        self._dedup_lock = threading.Lock()
+        self.upload_index = {} if upload_index is None else upload_index
+        self.download_cache = download_cache
 
     def __enter__(self):
         self.login()
@@ -34,15 +50,22 @@ class SynologyDrive(LabelsMixin, FilesMixin, TasksMixin):
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.logout()
 
-    def login(self):
-        return self.session.login('SynologyDrive')
+    def login(self, timeout: Optional[float] = None):
+        return self.session.login('SynologyDrive', timeout)
+
+    def relogin(self, stale_sid: Optional[str], timeout: Optional[float] = None) -> bool:
+        return self.session.relogin('SynologyDrive', stale_sid, timeout)
 
     def logout(self):
         return self.session.logout('SynologyDrive')
 
-    def get_info(self):
+    def get_info(self, timeout: Optional[float] = None):
+        """
+        :param timeout: seconds to wait for nas, wait forever if None
+        :return:
+        """
         api_name = 'SYNO.SynologyDrive.Info'
-        info = self.session.get_api_list(api_name)
+        info = self.session.get_api_list(api_name, timeout)
         endpoint = info['path']
         params = {'api': api_name, 'version': info['maxVersion'], 'method': 'get', '_sid': self.session.sid}
-        return self.session.http_get(endpoint, params=params)
+        return self.session.http_get(endpoint, params=params, timeout=timeout)
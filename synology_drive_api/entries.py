@@ -0,0 +1,147 @@
+import sys
+from array import array
+from typing import Iterable, Iterator, List
+
+from synology_drive_api import serializers
+
+# frequently used fields, others are kept as json bytes and decoded on access
+ENTRY_FIELDS = ('file_id', 'name', 'display_path', 'type', 'size', 'modified_time', 'created_time', 'parent_id')
+_INT_FIELDS = ('size', 'modified_time', 'created_time')
+
+
+class FileEntry:
+    """
+    compact file/folder entry of list results, rarely used fields are decoded lazily
+    entry.labels, entry.owner, ... are looked up in the raw item
+    """
+    __slots__ = ENTRY_FIELDS + ('_extra',)
+
+    def __init__(self, file_id: str, name: str, display_path: str = '', type: str = 'file', size: int = 0,
+                 modified_time: int = 0, created_time: int = 0, parent_id: str = '', extra: bytes = b'{}') -> None:
+        self.file_id = file_id
+        self.name = name
+        self.display_path = display_path
+        self.type = type
+        self.size = size
+        self.modified_time = modified_time
+        self.created_time = created_time
+        self.parent_id = parent_id
+        self._extra = extra
+
+    @classmethod
+    def from_item(cls, item: dict) -> 'FileEntry':
+        """
+        :param item: single item of list results
+        :return:
+        """
+        extra = {key: value for key, value in item.items() if key not in ENTRY_FIELDS}
+        return cls(
+            file_id=item.get('file_id', ''),
+            name=item.get('name', ''),
+            display_path=item.get('display_path', ''),
+            type=sys.intern(item.get('type', 'file')),
+            size=item.get('size') or 0,
+            modified_time=item.get('modified_time') or 0,
+            created_time=item.get('created_time') or 0,
+            parent_id=item.get('parent_id', ''),
+            extra=serializers.dumps(extra),
+        )
+
+    @property
+    def extra(self) -> dict:
+        """
+        rarely used fields, decoded on every access
+        """
+        return serializers.loads(self._extra)
+
+    @property
+    def is_dir(self) -> bool:
+        return self.type == 'dir'
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        try:
+            return self.extra[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def to_dict(self) -> dict:
+        """
+        :return: item fields, frequently used fields missing in raw item have default values, such as size 0
+        """
+        item = {field: getattr(self, field) for field in ENTRY_FIELDS}
+        item.update(self.extra)
+        return item
+
+    def __repr__(self):
+        return f"FileEntry(file_id={self.file_id!r}, display_path={self.display_path!r}, type={self.type!r})"
+
+
+class FileEntryBatch:
+    """
+    columnar file/folder entries, integer fields are stored in arrays.
+    Export columns to numpy or pandas for vectorized filtering.
+    """
+
+    def __init__(self, items: Iterable[dict] = ()) -> None:
+        self.columns = {field: array('q') if field in _INT_FIELDS else [] for field in ENTRY_FIELDS}
+        self._extra: List[bytes] = []
+        self.extend(items)
+
+    @classmethod
+    def from_response(cls, resp: dict) -> 'FileEntryBatch':
+        """
+        :param resp: list_folder, list_labelled_files response
+        :return:
+        """
+        return cls(resp['data']['items'])
+
+    def append(self, item: dict) -> None:
+        """
+        :param item: single item of list results
+        """
+        entry = FileEntry.from_item(item)
+        for field in ENTRY_FIELDS:
+            self.columns[field].append(getattr(entry, field))
+        self._extra.append(entry._extra)
+
+    def extend(self, items: Iterable[dict]) -> None:
+        for item in items:
+            self.append(item)
+
+    def __len__(self) -> int:
+        return len(self._extra)
+
+    def __getitem__(self, index: int) -> FileEntry:
+        return FileEntry(*(self.columns[field][index] for field in ENTRY_FIELDS), extra=self._extra[index])
+
+    def __iter__(self) -> Iterator[FileEntry]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def to_numpy(self) -> dict:
+        """
+        :return: {column_name: numpy array}, columns are copied, batch can be extended afterwards
+        """
+        import numpy as np
+
+        # a view on array('q') would lock the batch, array can't be resized while its buffer is exported
+        return {field: np.array(column, dtype=np.int64 if field in _INT_FIELDS else object)
+                for field, column in self.columns.items()}
+
+    def to_pandas(self):
+        """
+        :return: pandas DataFrame, one row per entry
+        """
+        import pandas as pd
+
+        return pd.DataFrame(self.to_numpy())
+
+
+def entries_from_response(resp: dict) -> List[FileEntry]:
+    """
+    :param resp: list_folder, list_labelled_files, get_teamfolder_info raw response
+    :return:
+    """
+    return [FileEntry.from_item(item) for item in resp['data']['items']]
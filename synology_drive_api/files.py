@@ -1,23 +1,112 @@
 import io
 import os
+import shutil
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from itertools import islice
 from pathlib import Path
 from time import time, sleep
-from typing import Optional, Union, BinaryIO
+from typing import Optional, Union, BinaryIO, Callable, Iterable, Iterator, List, Tuple
 
-from synology_drive_api.base import SynologyOfficeFileConvertFailed
+from synology_drive_api import serializers
+from synology_drive_api.base import SynologyException, SynologyOfficeFileConvertFailed
+from synology_drive_api.entries import FileEntry, entries_from_response
 from synology_drive_api.utils import concat_drive_path
+from synology_drive_api.utils import hash_file_content, HashingReader, MultipartFileReader
+from synology_drive_api.utils import chunks
 from synology_drive_api.utils import form_urlencoded
 from synology_drive_api.utils import deprecate
 
+# invalid parameter, api, method or version not supported
+UNSUPPORTED_API_ERROR_CODES = (101, 102, 103, 104, 120)
+
+
+def read_office_export(file: BinaryIO, export_name: str):
+    """
+    default parser of exported office files
+    :param file: seekable exported xlsx
+    :param export_name: such as 'test.xlsx'
+    :return: {sheet_name: DataFrame, ...}
+    """
+    if not export_name.endswith('.xlsx'):
+        raise ValueError(f'No default parser for <{export_name}>, pass parser to export_office_files.')
+    import pandas as pd
+
+    return pd.read_excel(file, sheet_name=None)
+
+
+def to_timestamp(value: Union[None, int, float, datetime]) -> Optional[int]:
+    """
+    :param value: epoch seconds or datetime
+    :return: epoch seconds
+    """
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    return None if value is None else int(value)
+
+
+def build_search_filter(keyword: Optional[str] = None, extensions: Optional[List[str]] = None,
+                        file_type: Optional[str] = None, label_ids: Optional[List[str]] = None,
+                        modified_after: Union[None, int, datetime] = None,
+                        modified_before: Union[None, int, datetime] = None) -> dict:
+    """
+    build SYNO.SynologyDrive.Files filter, None conditions are skipped
+    :param keyword: file name keyword
+    :param extensions: ['xlsx', 'osheet']
+    :param file_type: 'file' or 'dir'
+    :param label_ids: files with any of these labels
+    :param modified_after: epoch seconds or datetime
+    :param modified_before: epoch seconds or datetime
+    :return:
+    """
+    search_filter = {
+        'keyword': keyword,
+        'extensions': [extension.lstrip('.').lower() for extension in extensions] if extensions else None,
+        'file_type': file_type,
+        'labels': [str(label_id) for label_id in label_ids] if label_ids else None,
+        'modified_time_from': to_timestamp(modified_after),
+        'modified_time_to': to_timestamp(modified_before),
+    }
+    return {key: value for key, value in search_filter.items() if value is not None}
+
+
+def match_search_filter(item: dict, search_filter: dict) -> bool:
+    """
+    client side filter, same conditions as build_search_filter
+    :param item: single item of list results
+    :param search_filter: build_search_filter return value
+    :return:
+    """
+    name = item.get('name', '')
+    if 'keyword' in search_filter and search_filter['keyword'].lower() not in name.lower():
+        return False
+    if 'extensions' in search_filter and Path(name).suffix.lstrip('.').lower() not in search_filter['extensions']:
+        return False
+    if 'file_type' in search_filter and item.get('type') != search_filter['file_type']:
+        return False
+    if 'labels' in search_filter:
+        item_label_ids = {str(label['label_id']) if isinstance(label, dict) else str(label)
+                          for label in item.get('labels') or []}
+        if item_label_ids.isdisjoint(search_filter['labels']):
+            return False
+    modified_time = item.get('modified_time') or 0
+    if 'modified_time_from' in search_filter and modified_time < search_filter['modified_time_from']:
+        return False
+    if 'modified_time_to' in search_filter and modified_time > search_filter['modified_time_to']:
+        return False
+    return True
+
 
 class FilesMixin:
     """
     file folder related function
     """
 
-    def get_teamfolder_info(self):
+    def get_teamfolder_info(self, typed: bool = False):
         """
         get teamfolder sub_folder info
+        :param typed: return FileEntry list instead
         :return: {sub_folder_name: folder_id, ...}
         """
         api_name = 'SYNO.SynologyDrive.TeamFolders'
@@ -29,6 +118,9 @@ class FilesMixin:
         if not resp['success']:
             raise Exception('Get teamfolder info failed.')
 
+        if typed:
+            return entries_from_response(resp)
+
         if resp['data']['total'] == 0:
             return {}
 
@@ -68,6 +160,96 @@ class FilesMixin:
         urlencoded_data = form_urlencoded(data)
         return self.session.http_post(endpoint, data=urlencoded_data)
 
+    def share_many(self, share_paths: List[str], role: str = 'editor', chunk_size: int = 100,
+                   max_workers: int = 4) -> dict:
+        """
+        share files or folders, same as share_file. Create and update calls are sent in compound requests.
+        :param share_paths: ['id:23333333333', '23333333333', 'team-folders/folder2/', ...]
+        :param role: 'viewer', 'commenter', 'editor'
+        :param chunk_size: path count of every compound request
+        :param max_workers: concurrent compound requests
+        :return: {'links': {path: sharing_link, ...}, 'errors': {path: error, ...}}
+        """
+        api_name = 'SYNO.SynologyDrive.AdvanceSharing'
+
+        def share_chunk(chunk: List[Tuple[str, str]]) -> Tuple[dict, dict]:
+            links, errors = {}, {}
+            compound = [{'api': api_name, 'version': 1, 'method': 'create', 'path': path_params, 'role': role}
+                        for _, path_params in chunk]
+            resp = self.session.compound_request(compound)
+            created = []
+            for (path, path_params), result in zip(chunk, resp['data']['result']):
+                if result['success']:
+                    created.append((path, path_params, result['data']['sharing_link']))
+                else:
+                    errors[path] = result.get('error')
+            if not created:
+                return links, errors
+            compound = [{'api': api_name, 'version': 1, 'method': 'update', 'sharing_link': sharing_link,
+                         'role': role, 'due_date': 0, 'path': path_params}
+                        for _, path_params, sharing_link in created]
+            resp = self.session.compound_request(compound)
+            for (path, _, sharing_link), result in zip(created, resp['data']['result']):
+                if result['success']:
+                    links[path] = sharing_link
+                else:
+                    errors[path] = result.get('error')
+            return links, errors
+
+        path_pairs = [(path, f"id:{path}" if path.isdigit() else path) for path in share_paths]
+        return self._run_compound_chunks(path_pairs, share_chunk, chunk_size, max_workers)
+
+    def create_links(self, file_or_folder_paths: List[str], chunk_size: int = 100, max_workers: int = 4) -> dict:
+        """
+        create links of files or folders, same as create_link. Calls are sent in compound requests.
+        :param file_or_folder_paths: ['23333333333', 'team-folders/folder2/', ...]
+        :param chunk_size: path count of every compound request
+        :param max_workers: concurrent compound requests
+        :return: {'links': {path: link info, ...}, 'errors': {path: error, ...}}
+        """
+        api_name = 'SYNO.SynologyDrive.Sharing'
+
+        def create_chunk(chunk: List[Tuple[str, str]]) -> Tuple[dict, dict]:
+            links, errors = {}, {}
+            compound = [{'api': api_name, 'method': 'create_link', 'version': 1, 'path': path_params}
+                        for _, path_params in chunk]
+            resp = self.session.compound_request(compound)
+            for (path, _), result in zip(chunk, resp['data']['result']):
+                if result['success']:
+                    links[path] = result.get('data')
+                else:
+                    errors[path] = result.get('error')
+            return links, errors
+
+        path_pairs = [(path, f"id:{path}" if path.isdigit() else self._folder_path(path))
+                      for path in file_or_folder_paths]
+        return self._run_compound_chunks(path_pairs, create_chunk, chunk_size, max_workers)
+
+    @staticmethod
+    def _run_compound_chunks(path_pairs: List[Tuple[str, str]],
+                             chunk_handler: Callable[[List[Tuple[str, str]]], Tuple[dict, dict]],
+                             chunk_size: int, max_workers: int) -> dict:
+        """
+        run chunk handler concurrently, failed chunks are reported as errors of every path
+        :param path_pairs: [(path, path_params), ...]
+        :param chunk_handler: return ({path: link}, {path: error})
+        :param chunk_size: path count of every chunk
+        :param max_workers: concurrent chunks
+        :return: {'links': {...}, 'errors': {...}}
+        """
+        ret = {'links': {}, 'errors': {}}
+        path_chunks = list(chunks(path_pairs, chunk_size))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(chunk_handler, chunk) for chunk in path_chunks]
+            for chunk, future in zip(path_chunks, futures):
+                try:
+                    links, errors = future.result()
+                except Exception as e:
+                    links, errors = {}, {path: e for path, _ in chunk}
+                ret['links'].update(links)
+                ret['errors'].update(errors)
+        return ret
+
     def copy(self, source: str, dist: str) -> dict:
         """
         copy file or dir
@@ -83,22 +265,128 @@ class FilesMixin:
                   'files': f'["{source}"]'}
         return self.session.http_put(endpoint, params=params)
 
-    def list_folder(self, dir_path: str) -> dict:
+    def list_folder(self, dir_path: str, typed: bool = False, sort_by: str = 'owner', sort_direction: str = 'asc',
+                    offset: int = 0, limit: int = 1000,
+                    search_filter: Optional[dict] = None) -> Union[dict, List[FileEntry]]:
         """
         :param dir_path: '/team-folders/folder_name/folder_name1' or '430167496067125111'
+        :param typed: return FileEntry list instead of raw response
+        :param sort_by: 'name', 'owner', 'modified_time', 'size', 'type'
+        :param sort_direction: 'asc', 'desc'
+        :param offset: index of first item
+        :param limit: max item count
+        :param search_filter: build_search_filter return value, sent to drive
         :return:
         """
-        if dir_path.isdigit():
-            dest_path = f"id:{dir_path}"
-        else:
-            # add start position /
-            dest_path = f"/{dir_path}" if not dir_path.startswith('/') else dir_path
+        dest_path = self._folder_path(dir_path)
+        api_name = 'SYNO.SynologyDrive.Files'
+        endpoint = 'entry.cgi'
+        # requests can't encode dict param, send json string instead
+        filter_param = serializers.dumps(search_filter).decode('utf-8') if search_filter else {}
+        params = {'api': api_name, 'version': 2, 'method': 'list', 'filter': filter_param,
+                  'sort_direction': sort_direction, 'sort_by': sort_by, 'offset': offset, 'limit': limit,
+                  'path': dest_path}
+        resp = self.session.http_get(endpoint, params=params)
+        return entries_from_response(resp) if typed else resp
 
+    def iter_folder(self, dir_path: str, sort_by: str = 'name', sort_direction: str = 'asc', page_size: int = 1000,
+                    search_filter: Optional[dict] = None) -> Iterator[dict]:
+        """
+        list all items of folder page by page
+        :param dir_path: '/team-folders/folder_name/folder_name1' or '430167496067125111'
+        :param sort_by: 'name', 'owner', 'modified_time', 'size', 'type'
+        :param sort_direction: 'asc', 'desc'
+        :param page_size: item count of every request
+        :param search_filter: build_search_filter return value, sent to drive
+        :return: item generator
+        """
+        offset = 0
+        while True:
+            resp = self.list_folder(dir_path, sort_by=sort_by, sort_direction=sort_direction, offset=offset,
+                                    limit=page_size, search_filter=search_filter)
+            items = resp['data']['items']
+            yield from items
+            offset += len(items)
+            if len(items) < page_size or offset >= resp['data'].get('total', offset + 1):
+                break
+
+    def search_files(self, dir_path: str, keyword: Optional[str] = None, extensions: Optional[List[str]] = None,
+                     file_type: Optional[str] = None, labels: Optional[List[str]] = None,
+                     modified_after: Union[None, int, datetime] = None,
+                     modified_before: Union[None, int, datetime] = None, sort_by: str = 'name',
+                     sort_direction: str = 'asc', page_size: int = 1000) -> Iterator[dict]:
+        """
+        search files under folder and its sub folders, filter and sort are sent to drive search api.
+        If search api is not supported (UNSUPPORTED_API_ERROR_CODES), folders are listed with the same filter and
+        checked page by page, items are sorted within every folder then. Other errors are raised.
+        :param dir_path: '/team-folders/folder_name' or '430167496067125111'
+        :param keyword: file name keyword
+        :param extensions: ['xlsx', 'osheet']
+        :param file_type: 'file' or 'dir'
+        :param labels: label names, files with any of these labels
+        :param modified_after: epoch seconds or datetime
+        :param modified_before: epoch seconds or datetime
+        :param sort_by: 'name', 'owner', 'modified_time', 'size', 'type'
+        :param sort_direction: 'asc', 'desc'
+        :param page_size: item count of every request
+        :return: item generator
+        """
+        label_ids = [self.label_dict[label] for label in labels] if labels else None
+        search_filter = build_search_filter(keyword, extensions, file_type, label_ids, modified_after,
+                                            modified_before)
+        items = self._iter_search(dir_path, search_filter, sort_by, sort_direction, page_size)
+        try:
+            # first search request is sent here
+            first_item = next(items, None)
+        except SynologyException as e:
+            # search api or filter is not supported, other errors such as expired sid would fail listing too
+            if e.code not in UNSUPPORTED_API_ERROR_CODES:
+                raise
+            items = self._walk_folder(dir_path, search_filter, sort_by, sort_direction, page_size)
+            first_item = None
+        if first_item is not None and match_search_filter(first_item, search_filter):
+            yield first_item
+        # drive may ignore unsupported conditions, check them again
+        for item in items:
+            if match_search_filter(item, search_filter):
+                yield item
+
+    def _walk_folder(self, dir_path: str, search_filter: dict, sort_by: str, sort_direction: str,
+                     page_size: int) -> Iterator[dict]:
+        """
+        list folder and sub folders, same range as search api
+        """
+        folders = [dir_path]
+        while folders:
+            folder = folders.pop(0)
+            if not search_filter:
+                for item in self.iter_folder(folder, sort_by, sort_direction, page_size):
+                    yield item
+                    if item.get('type') == 'dir':
+                        folders.append(item['file_id'])
+                continue
+            yield from self.iter_folder(folder, sort_by, sort_direction, page_size, search_filter=search_filter)
+            # filtered items may exclude folders, list them separately
+            sub_folders = self.iter_folder(folder, sort_by, sort_direction, page_size,
+                                           search_filter={'file_type': 'dir'})
+            folders.extend(item['file_id'] for item in sub_folders if item.get('type') == 'dir')
+
+    def _iter_search(self, dir_path: str, search_filter: dict, sort_by: str, sort_direction: str,
+                     page_size: int) -> Iterator[dict]:
         api_name = 'SYNO.SynologyDrive.Files'
         endpoint = 'entry.cgi'
-        params = {'api': api_name, 'version': 2, 'method': 'list', 'filter': {}, 'sort_direction': 'asc',
-                  'sort_by': 'owner', 'offset': 0, 'limit': 1000, 'path': dest_path}
-        return self.session.http_get(endpoint, params=params)
+        offset = 0
+        while True:
+            data = {'api': api_name, 'version': 2, 'method': 'search', 'location': self._folder_path(dir_path),
+                    'filter': search_filter, 'sort_by': sort_by, 'sort_direction': sort_direction,
+                    'offset': offset, 'limit': page_size}
+            urlencoded_data = form_urlencoded(data)
+            resp = self.session.http_post(endpoint, data=urlencoded_data)
+            items = resp['data']['items']
+            yield from items
+            offset += len(items)
+            if len(items) < page_size or offset >= resp['data'].get('total', offset + 1):
+                break
 
     def create_folder(self, folder_name: str, dest_folder_path: Optional[str] = None) -> dict:
         """
@@ -132,35 +420,103 @@ class FilesMixin:
         return self.session.http_post(endpoint, data=urlencoded_data)
 
     def upload_file(self, file: Union[io.BytesIO, BinaryIO], dest_folder_path: Optional[str] = None,
-                    conflict_action='version')-> dict:
+                    conflict_action='version', dedup: bool = False, stream: bool = False) -> dict:
         """
         upload file to drive
         :param file: binary_file
         :param dest_folder_path: upload folder path
         :param conflict_action: 'autorename' to rename the new, 'version' to rewrite the file.
                                 Default is 'version', same as UI default behaviour.
+        :param dedup: skip uploading if drive file is identical to file uploaded before, then file info is returned.
+        :param stream: send file chunk by chunk, file must be seekable. By default requests builds
+                       the whole multipart body in memory before sending.
         :return:
         """
         file_name = file.name
         display_path = concat_drive_path(dest_folder_path, file_name)
+        if dedup:
+            duplicate_ret = self._get_uploaded_duplicate(file, display_path)
+            if duplicate_ret is not None:
+                return duplicate_ret
+        if stream:
+            start = file.tell()
+            size = file.seek(0, io.SEEK_END) - start
+            file.seek(start)
+        if dedup:
+            # hash content while uploading, no extra pass for new files
+            file = HashingReader(file)
         api_name = 'SYNO.SynologyDrive.Files'
         endpoint = 'entry.cgi'
         params = {'api': api_name, 'method': 'upload', 'version': 2, 'path': display_path,
                   'type': 'file', 'conflict_action': conflict_action}
-        files = {'file': file}
-        upload_ret = self.session.http_post(endpoint, params=params, files=files)
+        if stream:
+            body = MultipartFileReader(file, size)
+            upload_ret = self.session.http_post(endpoint, params=params, data=body,
+                                                headers={'Content-Type': body.content_type})
+        else:
+            files = {'file': file}
+            upload_ret = self.session.http_post(endpoint, params=params, files=files)
+        if dedup:
+            self.upload_index[display_path] = {'hash': file.hexdigest(), 'size': file.size,
+                                               'file_id': upload_ret['data']['file_id'],
+                                               'modified_time': upload_ret['data'].get('modified_time')}
         return upload_ret
 
-    def download_file(self, file_path: str) -> io.BytesIO:
+    def upload_files(self, files: Iterable[Union[io.BytesIO, BinaryIO]], dest_folder_path: Optional[str] = None,
+                     conflict_action='version', dedup: bool = False, stream: bool = False) -> List[dict]:
+        """
+        upload files to the same drive folder
+        :param files: binary files
+        :param dest_folder_path: upload folder path
+        :param conflict_action: 'autorename' to rename the new, 'version' to rewrite the file.
+        :param dedup: skip uploading identical files, see upload_file
+        :param stream: send files chunk by chunk, see upload_file
+        :return: upload result of every file
+        """
+        return [self.upload_file(file, dest_folder_path, conflict_action=conflict_action, dedup=dedup, stream=stream)
+                for file in files]
+
+    def _get_uploaded_duplicate(self, file: Union[io.BytesIO, BinaryIO], display_path: str) -> Optional[dict]:
+        """
+        compare file with upload index and remote size/modified_time
+        :param file: binary file
+        :param display_path: drive path of file
+        :return: drive file info if file is a duplicate, else None
+        """
+        uploaded = self.upload_index.get(display_path)
+        if uploaded is None:
+            return None
+        # size is cheap, only hash files with same size
+        start = file.tell()
+        size = file.seek(0, io.SEEK_END) - start
+        file.seek(start)
+        if size != uploaded['size']:
+            return None
+        if hash_file_content(file)[0] != uploaded['hash']:
+            return None
+        # drive file may be modified by others since last upload
+        try:
+            ret = self.get_file_or_folder_info(uploaded['file_id'])
+        except SynologyException:
+            return None
+        if ret['data'].get('size') != size or ret['data'].get('modified_time') != uploaded['modified_time']:
+            return None
+        with self._dedup_lock:
+            self.dedup_skipped_files += 1
+            self.dedup_skipped_bytes += size
+        return ret
+
+    def download_file(self, file_path: str, stream: bool = False) -> Union[io.BytesIO, BinaryIO]:
         """
         download file from drive
         :param file_path:
+        :param stream: return file-like response body instead of reading whole file into memory
         :return:
         """
         ret = self.get_file_or_folder_info(file_path)
         file_name = ret['data']['name']
         if Path(file_name).suffix in ['.osheet', 'odoc']:
-            bio_ret_with_name = self.download_synology_office_file(file_path)
+            bio_ret_with_name = self._export_office_file(ret['data'], stream)
         else:
             file_id = ret['data']['file_id']
             api_name = 'SYNO.SynologyDrive.Files'
@@ -168,11 +524,35 @@ class FilesMixin:
             # \42: "
             params = {'api': api_name, 'method': 'download', 'version': 2, 'files': f"[\42id:{file_id}\42]",
                       'force_download': True, 'json_error': True, '_dc': str(time() * 1000)[:13]}
-            bio_ret = self.session.http_get(endpoint, params=params, bio=True)
-            bio_ret_with_name = io.BytesIO(bio_ret)
+            bio_ret_with_name = self._download_body(endpoint, params, stream, ret['data'])
             bio_ret_with_name.name = file_name
         return bio_ret_with_name
 
+    def _download_body(self, endpoint: str, params: dict, stream: bool,
+                       file_info: dict) -> Union[io.BytesIO, BinaryIO]:
+        """
+        :param endpoint: download endpoint
+        :param params: download params
+        :param stream: return file-like response body
+        :param file_info: drive file info, used as download cache key
+        :return:
+        """
+        if self.download_cache is not None:
+            cache_key = self.download_cache.make_key(file_info)
+            content = self.download_cache.get(cache_key)
+            if content is not None:
+                return io.BytesIO(content)
+            if stream:
+                body = self.session.http_get(endpoint, params=params, bio=True, stream=True)
+                return self.download_cache.tee(cache_key, body)
+            content = self.session.http_get(endpoint, params=params, bio=True)
+            self.download_cache.put(cache_key, content)
+            return io.BytesIO(content)
+        if stream:
+            return self.session.http_get(endpoint, params=params, bio=True, stream=True)
+        # BytesIO shares bytes buffer until it is written, body isn't copied
+        return io.BytesIO(self.session.http_get(endpoint, params=params, bio=True))
+
     def convert_to_online_office(self, file_path: str, delete_original_file=True, conflict_action='autorename'):
         """
         convert file to online synology office file
@@ -240,28 +620,98 @@ class FilesMixin:
             raise e
         return convert_ret
 
-    def download_synology_office_file(self, file_path: str) -> io.BytesIO:
+    def download_synology_office_file(self, file_path: str, stream: bool = False) -> Union[io.BytesIO, BinaryIO]:
         """
         download synology office file as excel or word
         :param file_path: file/folder or file/folder id "552146100935505098"
+        :param stream: return file-like response body instead of reading whole file into memory
         :return:
         """
         if not file_path.isdigit() and '.' not in file_path:
             raise Exception('file_path should be id or path with file extension, extensions are osheet or odoc')
 
         ret = self.get_file_or_folder_info(file_path)
-        file_name = ret['data']['name']
-        export_end_point = file_name.replace('osheet', 'xlsx').replace('odoc', 'docx')
-        file_id = ret['data']['file_id']
+        return self._export_office_file(ret['data'], stream)
 
+    def _export_office_file(self, file_info: dict, stream: bool) -> Union[io.BytesIO, BinaryIO]:
+        """
+        :param file_info: drive file info of osheet or odoc
+        :param stream: return file-like response body
+        :return:
+        """
+        export_end_point = file_info['name'].replace('osheet', 'xlsx').replace('odoc', 'docx')
         api_name = 'SYNO.Office.Export'
         endpoint = f"entry.cgi/{export_end_point}"
-        params = {'api': api_name, 'method': 'download', 'version': 1, 'path': f"id:{file_id}"}
-        bio_ret = self.session.http_get(endpoint, params=params, bio=True)
-        bio_ret_with_name = io.BytesIO(bio_ret)
+        params = {'api': api_name, 'method': 'download', 'version': 1, 'path': f"id:{file_info['file_id']}"}
+        bio_ret_with_name = self._download_body(endpoint, params, stream, file_info)
         bio_ret_with_name.name = export_end_point
         return bio_ret_with_name
 
+    def iter_export_office_files(self, file_paths: List[str],
+                                 parser: Callable[[BinaryIO, str], object] = read_office_export,
+                                 max_workers: int = 4,
+                                 memory_budget: int = 256 * 1024 ** 2
+                                 ) -> Iterator[Tuple[str, object, Optional[Exception]]]:
+        """
+        export synology office files concurrently and parse them, results are yielded as soon as they are ready.
+        A failed file doesn't stop others, its error is yielded instead of result.
+        :param file_paths: osheet/odoc paths or ids
+        :param parser: parser(file, export_name), default parser reads xlsx into {sheet_name: DataFrame}
+        :param max_workers: concurrent exports
+        :param memory_budget: max bytes of export buffers in memory, larger exports are buffered on disk
+        :return: (file_path, parsed result, None) or (file_path, None, error) generator
+        """
+        buffer_size = max(memory_budget // max_workers, 1)
+
+        def export_and_parse(file_path: str):
+            ret = self.get_file_or_folder_info(file_path)
+            body = self._export_office_file(ret['data'], stream=True)
+            # zip based xlsx/docx need seekable file, buffer is spilled to disk beyond its budget
+            with tempfile.SpooledTemporaryFile(max_size=buffer_size) as buffer:
+                try:
+                    shutil.copyfileobj(body, buffer, 64 * 1024)
+                finally:
+                    body.close()
+                buffer.seek(0)
+                return parser(buffer, body.name)
+
+        # at most max_workers exports are running or waiting to be yielded, parsed results don't pile up
+        pending_paths = iter(file_paths)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(export_and_parse, file_path): file_path
+                       for file_path in islice(pending_paths, max_workers)}
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    file_path = futures.pop(future)
+                    try:
+                        result, error = future.result(), None
+                    except Exception as e:
+                        result, error = None, e
+                    yield file_path, result, error
+                    next_path = next(pending_paths, None)
+                    if next_path is not None:
+                        futures[executor.submit(export_and_parse, next_path)] = next_path
+
+    def export_office_files(self, file_paths: List[str],
+                            parser: Callable[[BinaryIO, str], object] = read_office_export,
+                            max_workers: int = 4, memory_budget: int = 256 * 1024 ** 2) -> dict:
+        """
+        export synology office files concurrently and parse them
+        :param file_paths: osheet/odoc paths or ids
+        :param parser: parser(file, export_name), default parser reads xlsx into {sheet_name: DataFrame}
+        :param max_workers: concurrent exports
+        :param memory_budget: max bytes of export buffers in memory, larger exports are buffered on disk
+        :return: {'results': {file_path: parsed result, ...}, 'errors': {file_path: error, ...}}
+        """
+        ret = {'results': {}, 'errors': {}}
+        for file_path, result, error in self.iter_export_office_files(file_paths, parser, max_workers, memory_budget):
+            if error is None:
+                ret['results'][file_path] = result
+            else:
+                ret['errors'][file_path] = error
+        return ret
+
     def rename_path(self, new_name: str, dest_path: str) -> dict:
         """
         rename file or folder
@@ -282,8 +732,7 @@ class FilesMixin:
 
     def move_path(self, ready_for_move_paths: str, dest_folder: str) -> dict:
         """
-        # TODO ready_for_move_paths can be list，str.
-        move file or folder to another folder
+        move file or folder to another folder, use move_many for multiple paths
         :param ready_for_move_paths: file/folder name or file/folder id "552146100935505098"
         :param dest_folder: file/folder name or file/folder id "552146100935505098"
         :return:
@@ -327,3 +776,120 @@ class FilesMixin:
                 'permanent': 'false', 'revisions': ret['data']['revisions']}
         urlencoded_data = form_urlencoded(data)
         return self.session.http_post(endpoint, data=urlencoded_data)
+
+    def resolve_file_ids(self, paths: List[str], chunk_size: int = 500) -> List[str]:
+        """
+        resolve paths to file ids, ids are not resolved again
+        :param paths: ['/mydrive/test.xlsx', '552146100935505098', 'id:552146100935505098', ...]
+        :param chunk_size: path count of every info request
+        :return: ['id:552146100935505099', 'id:552146100935505098', 'id:552146100935505098', ...]
+        """
+        file_ids = [None] * len(paths)
+        unresolved = []
+        for index, path in enumerate(paths):
+            if path.isdigit():
+                file_ids[index] = f"id:{path}"
+            elif path.startswith('id:'):
+                file_ids[index] = path
+            else:
+                unresolved.append((index, path))
+
+        file_infos = self._get_file_infos([path for _, path in unresolved], chunk_size)
+        for (index, _), file_info in zip(unresolved, file_infos):
+            file_ids[index] = f"id:{file_info['file_id']}"
+        return file_ids
+
+    def _get_file_infos(self, paths: List[str], chunk_size: int = 500) -> List[dict]:
+        """
+        get info of many files, one compound request per chunk
+        :param paths: file/folder paths or ids
+        :param chunk_size: path count of every info request
+        :return: file info of every path, same order as paths
+        """
+        api_name = 'SYNO.SynologyDrive.Files'
+        file_infos = []
+        for chunk in chunks([self._folder_path(path) for path in paths], chunk_size):
+            compound = [{'api': api_name, 'method': 'get', 'version': 3, 'path': path} for path in chunk]
+            resp = self.session.compound_request(compound)
+            for path, result in zip(chunk, resp['data']['result']):
+                if not result['success']:
+                    raise Exception(f'Get file info of <{path}> failed: {result.get("error")}')
+                file_infos.append(result['data'])
+        return file_infos
+
+    def _batch_files_action(self, method: str, file_ids: List[str], chunk_size: int,
+                            file_params: Optional[dict] = None, **action_params) -> List[str]:
+        """
+        send files action in chunks
+        :param method: 'move', 'copy', 'delete'
+        :param file_ids: resolve_file_ids return value
+        :param chunk_size: file count of every request
+        :param file_params: {param_name: [value of every file, ...]}, sliced like file_ids for every request
+        :param action_params: other params of files action
+        :return: async task ids
+        """
+        api_name = 'SYNO.SynologyDrive.Files'
+        endpoint = 'entry.cgi'
+        task_ids = []
+        for start in range(0, len(file_ids), chunk_size):
+            chunk_params = {key: values[start:start + chunk_size] for key, values in (file_params or {}).items()}
+            data = {'api': api_name, 'method': method, 'version': 2, 'files': file_ids[start:start + chunk_size],
+                    **chunk_params, **action_params}
+            urlencoded_data = form_urlencoded(data)
+            ret = self.session.http_post(endpoint, data=urlencoded_data)
+            task_ids.append(ret['data']['async_task_id'])
+        return task_ids
+
+    def move_many(self, paths: List[str], dest_folder: str, conflict_action: str = 'autorename',
+                  chunk_size: int = 1000) -> List[str]:
+        """
+        move files or folders to another folder, it's a async task.
+        :param paths: file/folder paths or ids, ids skip path resolution
+        :param dest_folder: folder path or folder id "552146100935505098"
+        :param conflict_action: 'autorename' to rename the new, 'version' to rewrite the file.
+        :param chunk_size: file count of every move request
+        :return: async task ids, check them by get_tasks_status
+        """
+        return self._batch_files_action('move', self.resolve_file_ids(paths), chunk_size,
+                                        to_parent_folder=self._folder_path(dest_folder),
+                                        conflict_action=conflict_action)
+
+    def copy_many(self, paths: List[str], dest_folder: str, conflict_action: str = 'autorename',
+                  chunk_size: int = 1000) -> List[str]:
+        """
+        copy files or folders to another folder, it's a async task.
+        :param paths: file/folder paths or ids, ids skip path resolution
+        :param dest_folder: folder path or folder id "552146100935505098"
+        :param conflict_action: 'autorename' to rename the new, 'version' to rewrite the file.
+        :param chunk_size: file count of every copy request
+        :return: async task ids, check them by get_tasks_status
+        """
+        return self._batch_files_action('copy', self.resolve_file_ids(paths), chunk_size,
+                                        to_parent_folder=self._folder_path(dest_folder),
+                                        conflict_action=conflict_action)
+
+    def delete_many(self, paths: List[str], permanent: bool = False, chunk_size: int = 1000) -> List[str]:
+        """
+        delete files or folders, it's a async task.
+        Same as delete_path, revisions of every file are sent, so info of ids is requested too.
+        :param paths: file/folder paths or ids
+        :param permanent: delete permanently or move to recycle bin
+        :param chunk_size: file count of every delete request
+        :return: async task ids, check them by get_tasks_status
+        """
+        file_infos = self._get_file_infos(paths)
+        file_ids = [f"id:{file_info['file_id']}" for file_info in file_infos]
+        revisions = [file_info['revisions'] for file_info in file_infos]
+        return self._batch_files_action('delete', file_ids, chunk_size, file_params={'revisions': revisions},
+                                        permanent=str(permanent).lower())
+
+    @staticmethod
+    def _folder_path(folder: str) -> str:
+        """
+        :param folder: folder path or folder id "552146100935505098"
+        :return: 'id:552146100935505098' or '/team-folders/folder'
+        """
+        if folder.isdigit():
+            return f"id:{folder}"
+        # add start position /
+        return f"/{folder}" if not folder.startswith('/') else folder
@@ -1,7 +1,9 @@
+import threading
 from typing import Optional, List, Union
 
 from optionaldict import OptionalDict
 
+from synology_drive_api.entries import FileEntry, entries_from_response
 from synology_drive_api.utils import form_urlencoded
 
 
@@ -30,8 +32,9 @@ class LabelsMixin:
     """
     Drive labels related function
     """
-    # label dict cache
-    _label_dict: dict = dict()
+    # label dict cache, created per drive client
+    _label_dict: dict
+    _label_lock: threading.Lock
 
     def get_labels(self, name: Optional[str] = None) -> dict:
         """
@@ -147,12 +150,14 @@ class LabelsMixin:
         urlencoded_data = form_urlencoded(data)
         return self.session.http_post(endpoint, data=urlencoded_data)
 
-    def list_labelled_files(self, label_name=None, label_id=None, limit=1500) -> dict:
+    def list_labelled_files(self, label_name=None, label_id=None, limit=1500,
+                            typed: bool = False) -> Union[dict, List[FileEntry]]:
         """
         list specific label files
         :param label_name: label name
         :param label_id:
         :param limit: return result count
+        :param typed: return FileEntry list instead of raw response
         :return:
         """
         params_count = [label_name, label_id].count(None)
@@ -170,10 +175,13 @@ class LabelsMixin:
         data = {'api': api_name, 'version': 2, 'method': 'list_labelled', 'label_id': label_id, 'offset': 0,
                 'limit': limit, 'sort_by': 'name', 'sort_direction': 'desc', 'filter': {}}
         urlencoded_data = form_urlencoded(data)
-        return self.session.http_post(endpoint, data=urlencoded_data)
+        resp = self.session.http_post(endpoint, data=urlencoded_data)
+        return entries_from_response(resp) if typed else resp
 
     def set_label_dict(self, label_name, label_id):
-        self._label_dict[label_name] = label_id
+        with self._label_lock:
+            # replace instead of modifying, readers keep a consistent dict
+            self._label_dict = {**self._label_dict, label_name: label_id}
 
     @property
     def label_dict(self):
@@ -183,10 +191,13 @@ class LabelsMixin:
         """
         # if cache is disabled, get labels from drive server.
         if not self.enable_label_cache:
-            self._label_dict = self.get_labels()
-            return self._label_dict
+            label_dict = self.get_labels()
+            with self._label_lock:
+                self._label_dict = label_dict
+            return label_dict
 
-        # if cache is enabled and empty, fill up cache.
-        if not self._label_dict:
-            self._label_dict = self.get_labels()
-        return self._label_dict
+        # if cache is enabled and empty, fill up cache once.
+        with self._label_lock:
+            if not self._label_dict:
+                self._label_dict = self.get_labels()
+            return self._label_dict
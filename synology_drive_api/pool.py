@@ -0,0 +1,188 @@
+import inspect
+import threading
+from time import monotonic
+from typing import Iterable, List, Optional
+
+import requests
+
+from synology_drive_api.base import SynologyException
+from synology_drive_api.drive import SynologyDrive
+
+
+class NodeState:
+    """
+    health and load of a drive node
+    """
+    __slots__ = ('healthy', 'latency', 'in_flight', 'checked_at')
+
+    def __init__(self) -> None:
+        self.healthy: bool = True
+        # smoothed seconds per read request
+        self.latency: float = 0.0
+        self.in_flight: int = 0
+        self.checked_at: Optional[float] = None
+
+
+class SynologyDrivePool:
+    """
+    Drive clients of multiple nas, such as primary and ShareSync replicas.
+    Read functions called with paths are routed to the least loaded, lowest latency healthy node, others are sent
+    to primary. File, folder and label ids differ between nodes, calls with ids are sent to primary, and ids in
+    results of routed calls are ids of the node which answered, don't pass them to write functions.
+    """
+    # resolve_file_ids, get_labels aren't routed, they return ids
+    read_functions = frozenset({
+        'get_info', 'get_teamfolder_info', 'list_folder', 'get_file_or_folder_info',
+        'download_file', 'download_synology_office_file', 'list_labelled_files',
+    })
+    # arguments of read functions which may be node local ids
+    id_arguments = ('dir_path', 'file_path', 'file_or_folder_path', 'label_id')
+    # weight of the newest latency sample
+    latency_smoothing: float = 0.3
+
+    def __init__(self, primary: SynologyDrive, replicas: Iterable[SynologyDrive] = (),
+                 health_check_interval: float = 30, health_check_timeout: float = 5) -> None:
+        """
+        :param primary: drive of primary nas, receives all write functions
+        :param replicas: drives of replica nas, paths should be same as primary
+        :param health_check_interval: seconds between health checks
+        :param health_check_timeout: seconds to wait for every login and get_info of health check
+        """
+        self.primary = primary
+        self.nodes: List[SynologyDrive] = [primary, *replicas]
+        self.health_check_interval = health_check_interval
+        self.health_check_timeout = health_check_timeout
+        self._states = {id(node): NodeState() for node in self.nodes}
+        self._lock = threading.Lock()
+        # single flight health check
+        self._health_lock = threading.Lock()
+
+    def __enter__(self):
+        self.login()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.logout()
+
+    def login(self) -> None:
+        # primary is required, replicas are optional
+        self.primary.login()
+        for node in self.nodes[1:]:
+            try:
+                node.login()
+            except requests.RequestException:
+                self._states[id(node)].healthy = False
+
+    def logout(self) -> None:
+        for node in self.nodes:
+            try:
+                node.logout()
+            except requests.RequestException:
+                pass
+
+    def check_health(self) -> dict:
+        """
+        call get_info of every node, update health and latency. Unhealthy nodes login again first.
+        A node not answering within health_check_timeout is unhealthy.
+        :return: {node_index: healthy, ...}
+        """
+        health = {}
+        for index, node in enumerate(self.nodes):
+            state = self._states[id(node)]
+            start = monotonic()
+            try:
+                if not state.healthy:
+                    # login may have failed, or sid is expired
+                    node.session.expire()
+                    node.login(timeout=self.health_check_timeout)
+                    start = monotonic()
+                node.get_info(timeout=self.health_check_timeout)
+            except requests.RequestException:
+                state.healthy = False
+            else:
+                state.healthy = True
+                self._update_latency(state, monotonic() - start)
+            state.checked_at = monotonic()
+            health[index] = state.healthy
+        return health
+
+    def node_states(self) -> List[NodeState]:
+        return [self._states[id(node)] for node in self.nodes]
+
+    def _update_latency(self, state: NodeState, elapsed: float) -> None:
+        with self._lock:
+            if not state.latency:
+                state.latency = elapsed
+            else:
+                state.latency += self.latency_smoothing * (elapsed - state.latency)
+
+    def _health_check_due(self) -> bool:
+        checked_at = self._states[id(self.primary)].checked_at
+        return checked_at is None or monotonic() - checked_at > self.health_check_interval
+
+    def _pick_read_node(self) -> SynologyDrive:
+        if self._health_check_due():
+            # first check blocks every caller, later checks run in one caller while others use current states
+            never_checked = self._states[id(self.primary)].checked_at is None
+            if self._health_lock.acquire(blocking=never_checked):
+                try:
+                    if self._health_check_due():
+                        self.check_health()
+                finally:
+                    self._health_lock.release()
+        with self._lock:
+            healthy_nodes = [node for node in self.nodes if self._states[id(node)].healthy]
+            if not healthy_nodes:
+                node = self.primary
+            else:
+                node = min(healthy_nodes,
+                           key=lambda n: (self._states[id(n)].in_flight, self._states[id(n)].latency))
+            self._states[id(node)].in_flight += 1
+        return node
+
+    def _has_node_local_id(self, name: str, args: tuple, kwargs: dict) -> bool:
+        """
+        :return: True if call has file, folder or label id argument
+        """
+        try:
+            arguments = inspect.signature(getattr(self.primary, name)).bind(*args, **kwargs).arguments
+        except TypeError:
+            # wrong arguments, let primary raise
+            return True
+        for key in self.id_arguments:
+            value = arguments.get(key)
+            if key == 'label_id' and value is not None:
+                return True
+            if isinstance(value, int) or isinstance(value, str) and (value.isdigit() or value.startswith('id:')):
+                return True
+        return False
+
+    def _call_read(self, name: str, *args, **kwargs):
+        if self._has_node_local_id(name, args, kwargs):
+            return getattr(self.primary, name)(*args, **kwargs)
+        node = self._pick_read_node()
+        state = self._states[id(node)]
+        start = monotonic()
+        try:
+            ret = getattr(node, name)(*args, **kwargs)
+        except (requests.ConnectionError, SynologyException) as e:
+            if isinstance(e, requests.ConnectionError):
+                state.healthy = False
+            if node is self.primary:
+                raise
+            # replica is down, or behind primary such as file not synced yet, fall back to primary
+            return getattr(self.primary, name)(*args, **kwargs)
+        finally:
+            with self._lock:
+                state.in_flight -= 1
+        self._update_latency(state, monotonic() - start)
+        return ret
+
+    def __getattr__(self, name: str):
+        if name.startswith('_') or name == 'primary':
+            raise AttributeError(name)
+        if name in self.read_functions:
+            def read_function(*args, **kwargs):
+                return self._call_read(name, *args, **kwargs)
+            return read_function
+        return getattr(self.primary, name)
@@ -0,0 +1,87 @@
+"""
+json serializer backends, orjson and ujson are used if installed, otherwise simplejson.
+"""
+from typing import Callable, Optional, Union
+
+import simplejson
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover
+    ujson = None
+
+
+def _simplejson_dumps(obj) -> bytes:
+    return simplejson.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+def _orjson_dumps(obj) -> bytes:
+    try:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    except TypeError:
+        # types orjson doesn't support, such as Decimal
+        return _simplejson_dumps(obj)
+
+
+def _ujson_dumps(obj) -> bytes:
+    try:
+        return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False).encode('utf-8')
+    except (TypeError, OverflowError):
+        return _simplejson_dumps(obj)
+
+
+_backends = {
+    'simplejson': (_simplejson_dumps, simplejson.loads),
+}
+if ujson is not None:
+    _backends['ujson'] = (_ujson_dumps, ujson.loads)
+if orjson is not None:
+    _backends['orjson'] = (_orjson_dumps, orjson.loads)
+
+# current backend
+backend_name: str
+_dumps: Callable[[object], bytes]
+_loads: Callable[[Union[bytes, str]], object]
+
+
+def set_json_backend(name: Optional[str] = None) -> str:
+    """
+    choose json backend
+    :param name: 'orjson', 'ujson', 'simplejson'. If None, use the fastest installed one.
+    :return: backend name
+    """
+    global backend_name, _dumps, _loads
+    if name is None:
+        name = next(name for name in ('orjson', 'ujson', 'simplejson') if name in _backends)
+    try:
+        _dumps, _loads = _backends[name]
+    except KeyError:
+        raise KeyError(f'Json backend <{name}> is not installed. Installed: {", ".join(_backends)}')
+    backend_name = name
+    return name
+
+
+def dumps(obj) -> bytes:
+    """
+    serialize obj to utf-8 json bytes
+    :param obj:
+    :return:
+    """
+    return _dumps(obj)
+
+
+def loads(s: Union[bytes, str]):
+    """
+    deserialize json bytes or str
+    :param s:
+    :return:
+    """
+    return _loads(s)
+
+
+set_json_backend()
@@ -1,4 +1,4 @@
-from synology_drive_api.utils import form_urlencoded
+from typing import List
 
 
 class TasksMixin:
@@ -12,16 +12,15 @@ class TasksMixin:
         get task status
         :return:
         """
-        api_name = 'SYNO.Entry.Request'
-        endpoint = 'entry.cgi'
-        data = {
-            'stop_when_error': False,
-            'mode': 'parallel',
-            'api': api_name,
-            'compound': [{"api": "SYNO.SynologyDrive.Tasks", "method": "get", "version": 1, "task_id": task_id}],
-            'method': 'request',
-            'version': 1
-        }
-        urlencoded_data = form_urlencoded(data)
-        resp = self.session.http_post(endpoint, data=urlencoded_data)
-        return resp
+        compound = [{"api": "SYNO.SynologyDrive.Tasks", "method": "get", "version": 1, "task_id": task_id}]
+        return self.session.compound_request(compound)
+
+    def get_tasks_status(self, task_ids: List[str]):
+        """
+        get multiple tasks status in one request
+        :param task_ids: async task ids, such as move_many return value
+        :return: task status are in resp['data']['result'], same order as task_ids
+        """
+        compound = [{"api": "SYNO.SynologyDrive.Tasks", "method": "get", "version": 1, "task_id": task_id}
+                    for task_id in task_ids]
+        return self.session.compound_request(compound)
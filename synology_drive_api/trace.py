@@ -0,0 +1,140 @@
+"""
+record requests and responses into a trace file, replay them without nas
+"""
+import base64
+import gzip
+import hashlib
+import io
+import re
+import threading
+from collections import defaultdict, deque
+from time import sleep
+from typing import Optional, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from synology_drive_api import serializers
+
+REDACTED = b'REDACTED'
+_secret_params = re.compile(rb'\b(_sid|passwd|otp_code)=[^&]*')
+_secret_fields = re.compile(rb'"(sid|did|synotoken)"\s*:\s*"[^"]*"')
+# cache busting param of download
+_dc_param = re.compile(rb'&?\b_dc=[^&]*')
+_multipart_boundary = re.compile(r'multipart/[^;]+;.*\bboundary="?([^";]+)"?')
+
+
+def redact(data: Union[None, str, bytes]) -> bytes:
+    """
+    :param data: url, request body or response body
+    :return: data without sid, password, otp code
+    """
+    if data is None:
+        return b''
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    data = _secret_params.sub(rb'\1=' + REDACTED, data)
+    return _secret_fields.sub(rb'"\1":"' + REDACTED + rb'"', data)
+
+
+def request_key(request: requests.PreparedRequest) -> str:
+    """
+    key of recorded request, same request gets same key in recording and replaying
+    :param request:
+    :return:
+    """
+    url = urlsplit(request.url)
+    target = _dc_param.sub(b'', redact(f"{url.path}?{url.query}"))
+    body = request.body
+    if hasattr(body, 'read'):
+        # streamed body can't be read twice
+        body = None
+    boundary = _multipart_boundary.search(request.headers.get('Content-Type', ''))
+    if body and boundary:
+        # multipart boundary is random for every request
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        body = body.replace(boundary.group(1).encode('ascii'), b'BOUNDARY')
+    return f"{request.method} {target.decode('utf-8')} {hashlib.sha1(redact(body)).hexdigest()}"
+
+
+class TraceRecorder:
+    """
+    write gzip json lines trace, one line per response
+    """
+
+    def __init__(self, trace_path: str) -> None:
+        self.trace_path = trace_path
+        self._file = gzip.open(trace_path, 'wb')
+        self._lock = threading.Lock()
+
+    def record(self, resp: requests.Response) -> None:
+        """
+        :param resp: response, body is read
+        """
+        content = resp.content
+        # file bodies are replayed byte for byte, only api responses carry sid
+        if 'json' in resp.headers.get('Content-Type', ''):
+            content = redact(content)
+        line = {
+            'key': request_key(resp.request),
+            'status': resp.status_code,
+            'content_type': resp.headers.get('Content-Type'),
+            'elapsed': resp.elapsed.total_seconds(),
+            'content': base64.b64encode(content).decode('ascii'),
+        }
+        with self._lock:
+            # requests in flight may finish after recording is stopped
+            if not self._file.closed:
+                self._file.write(serializers.dumps(line) + b'\n')
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    requests transport adapter, serve recorded responses in recorded order
+    """
+
+    def __init__(self, trace_path: str, speed: Optional[float] = None) -> None:
+        """
+        :param trace_path: TraceRecorder trace file
+        :param speed: 1 to replay at recorded speed, 10 to replay 10 times faster, None to replay without waiting
+        """
+        super().__init__()
+        self.speed = speed
+        self._responses = defaultdict(deque)
+        self._lock = threading.Lock()
+        with gzip.open(trace_path, 'rb') as f:
+            for line in f:
+                recorded = serializers.loads(line)
+                self._responses[recorded['key']].append(recorded)
+
+    def send(self, request: requests.PreparedRequest, stream=False, timeout=None, verify=True, cert=None,
+             proxies=None) -> requests.Response:
+        key = request_key(request)
+        with self._lock:
+            try:
+                recorded = self._responses[key].popleft()
+            except IndexError:
+                raise requests.ConnectionError(f'No recorded response for <{key}>', request=request)
+        if self.speed:
+            sleep(recorded['elapsed'] / self.speed)
+        resp = requests.Response()
+        resp.status_code = recorded['status']
+        resp.headers = CaseInsensitiveDict()
+        if recorded['content_type']:
+            resp.headers['Content-Type'] = recorded['content_type']
+        # body is read from raw, same as a real streamed response
+        resp.raw = io.BytesIO(base64.b64decode(recorded['content']))
+        resp.url = request.url
+        resp.request = request
+        resp.encoding = 'utf-8'
+        return resp
+
+    def close(self) -> None:
+        pass
@@ -1,9 +1,10 @@
-import urllib.parse
+import hashlib
+import io
+import uuid
 import warnings
 import functools
 
-import simplejson as json
-from selenium import webdriver
+from synology_drive_api.serializers import dumps
 
 
 def get_local_ip_by_quick_connect_id(q_id):
@@ -13,6 +14,9 @@ def get_local_ip_by_quick_connect_id(q_id):
     :param q_id: QuickConnect ID
     :return:
     """
+    # selenium is slow to import, only import it here
+    from selenium import webdriver
+
     url = f"https://{q_id}.quickconnect.to/"
     driver = webdriver.Chrome()
     driver.implicitly_wait(20)
@@ -24,19 +28,48 @@ def get_local_ip_by_quick_connect_id(q_id):
     return value1.split('ipv4.')[1].split('.wan')[0]
 
 
+# bytes kept as they are by urllib.parse.quote(safe='')
+_QUOTE_SAFE_BYTES = frozenset(b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_.-~')
+
+
+def quote_bytes(value: bytes) -> str:
+    """
+    same as urllib.parse.quote_from_bytes(value, safe=''), one bytes.replace per distinct unsafe byte
+    :param value:
+    :return:
+    """
+    unsafe = set(value).difference(_QUOTE_SAFE_BYTES)
+    # quote % first, or quoted bytes would be quoted again
+    if 37 in unsafe:
+        value = value.replace(b'%', b'%25')
+        unsafe.discard(37)
+    for byte in unsafe:
+        value = value.replace(bytes((byte,)), b'%%%02X' % byte)
+    return value.decode('ascii')
+
+
 def form_urlencoded(data: dict) -> str:
     """
     Generate urlencoded data for body data
     :param data: ready for post data
     :return: return form data
     """
-    data_list = []
-    for key, value in data.items():
-        value_encode = urllib.parse.quote(json.dumps(value) if not isinstance(value, str) else value, safe='')
-        # [key, '=', value_encode]
-        data_list.append(f"{key}={value_encode}")
-    urlencoded_data = '&'.join(data_list)
-    return urlencoded_data
+    # non-str values are json bytes, quote them without decoding
+    return '&'.join(
+        f"{key}={quote_bytes(value.encode('utf-8') if isinstance(value, str) else dumps(value))}"
+        for key, value in data.items()
+    )
+
+
+def chunks(items: list, chunk_size: int):
+    """
+    split list into chunks
+    :param items: list
+    :param chunk_size: max length of every chunk
+    :return: chunk generator
+    """
+    for start in range(0, len(items), chunk_size):
+        yield items[start:start + chunk_size]
 
 
 def concat_drive_path(dest_path: str, end_point: str, default_folder: str = 'mydrive') -> str:
@@ -60,6 +93,82 @@ def concat_drive_path(dest_path: str, end_point: str, default_folder: str = 'myd
     return display_path
 
 
+def hash_file_content(file, chunk_size: int = 1024 * 1024) -> tuple:
+    """
+    Hash file content chunk by chunk, file position is restored afterwards
+    :param file: binary file
+    :param chunk_size: read size of every chunk
+    :return: (sha256 hex digest, content size)
+    """
+    start = file.tell()
+    hasher = hashlib.sha256()
+    size = 0
+    for chunk in iter(lambda: file.read(chunk_size), b''):
+        hasher.update(chunk)
+        size += len(chunk)
+    file.seek(start)
+    return hasher.hexdigest(), size
+
+
+class HashingReader:
+    """
+    file wrapper, hash content while requests streams it to drive
+    """
+
+    def __init__(self, file):
+        self._file = file
+        self._hasher = hashlib.sha256()
+        self.name = file.name
+        self.size = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._file.read(size)
+        self._hasher.update(chunk)
+        self.size += len(chunk)
+        return chunk
+
+    def hexdigest(self) -> str:
+        return self._hasher.hexdigest()
+
+
+class MultipartFileReader:
+    """
+    multipart/form-data body of one file, read chunk by chunk so requests streams it instead of buffering whole file
+    """
+
+    def __init__(self, file, size: int, field_name: str = 'file'):
+        """
+        :param file: binary file, file.name is used as upload file name
+        :param size: bytes left in file, used for Content-Length
+        :param field_name: form field name
+        """
+        self.boundary = uuid.uuid4().hex
+        # escape quote and line breaks like browsers do
+        file_name = file.name.replace('"', '%22').replace('\r', '%0D').replace('\n', '%0A')
+        head = (f'--{self.boundary}\r\nContent-Disposition: form-data; name="{field_name}"; filename="{file_name}"\r\n'
+                f'Content-Type: application/octet-stream\r\n\r\n').encode('utf-8')
+        tail = f'\r\n--{self.boundary}--\r\n'.encode('ascii')
+        self._parts = [io.BytesIO(head), file, io.BytesIO(tail)]
+        self._length = len(head) + size + len(tail)
+
+    @property
+    def content_type(self) -> str:
+        return f'multipart/form-data; boundary={self.boundary}'
+
+    def __len__(self) -> int:
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            return b''.join(part.read() for part in self._parts)
+        while self._parts:
+            chunk = self._parts[0].read(size)
+            if chunk:
+                return chunk
+            self._parts.pop(0)
+        return b''
+
+
 def deprecate(alt_func_names):
     def outer_wrapper(f):
         @functools.wraps(f)
@@ -0,0 +1,197 @@
+"""
+hundreds of threads share one SynologyDrive against a local stub nas
+
+python -m pytest tests/test_thread_safety.py
+"""
+import hashlib
+import io
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from synology_drive_api.drive import SynologyDrive
+
+THREAD_COUNT = 300
+SID = 'stub-sid'
+FILE_SIZE = 6
+FILE_MODIFIED_TIME = 1600000000
+
+
+class StubNasHandler(BaseHTTPRequestHandler):
+    """
+    answer auth, label list, file info and folder list, count requests per api method
+    """
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, data: dict, success: bool = True) -> None:
+        body = json.dumps({'success': success, 'data': data} if success else {'success': False, 'error': data})
+        body = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self) -> None:
+        query = parse_qs(urlsplit(self.path).query)
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if not self.headers.get('Content-Type', '').startswith('multipart/'):
+            # form body is sent as encoded bytes
+            query.update(parse_qs(body.decode('utf-8')))
+        api = query.get('api', [''])[0]
+        method = query.get('method', [''])[0]
+        self.server.count(f"{api}.{method}")
+
+        if api == 'SYNO.API.Auth':
+            # slow login widens the race between threads
+            time.sleep(0.05)
+            return self._reply({'sid': SID})
+        if query.get('_sid', [''])[0] != SID:
+            return self._reply({'code': 119}, success=False)
+        if api == 'SYNO.SynologyDrive.Labels' and method == 'list':
+            time.sleep(0.05)
+            return self._reply({'total': 1, 'items': [{'name': 'existing', 'label_id': '1'}]})
+        if method == 'get':
+            return self._reply({'file_id': '42', 'name': 'a.txt', 'size': FILE_SIZE,
+                                'modified_time': FILE_MODIFIED_TIME})
+        if method == 'list':
+            return self._reply({'total': 1, 'items': [{'file_id': '42', 'name': 'a.txt', 'type': 'file',
+                                                       'display_path': '/mydrive/a.txt'}]})
+        return self._reply({})
+
+    do_GET = do_POST = _handle
+
+
+class StubNas(ThreadingHTTPServer):
+    # every thread may connect at once
+    request_queue_size = THREAD_COUNT
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubNasHandler)
+        self.requests = {}
+        self._lock = threading.Lock()
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.requests[name] = self.requests.get(name, 0) + 1
+
+
+@pytest.fixture
+def nas():
+    server = StubNas()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def drive(nas):
+    return SynologyDrive('user', 'password', nas_domain=f"127.0.0.1:{nas.server_address[1]}", https=False)
+
+
+def run_threads(target, count: int = THREAD_COUNT) -> list:
+    """
+    start all threads at once
+    :return: exceptions raised by target
+    """
+    barrier = threading.Barrier(count)
+    errors = []
+
+    def worker(index):
+        barrier.wait()
+        try:
+            target(index)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+def test_concurrent_login_is_single_flight(nas, drive):
+    sids = []
+
+    def login(index):
+        drive.login()
+        sids.append(drive.session.sid)
+
+    assert run_threads(login) == []
+    assert nas.requests['SYNO.API.Auth.login'] == 1
+    assert sids == [SID] * THREAD_COUNT
+
+
+def test_concurrent_requests_keep_caller_params(nas, drive):
+    drive.login()
+    # shared by every thread, sid must not be written into it
+    params = {'api': 'SYNO.SynologyDrive.Files', 'method': 'list', 'version': 2, 'path': '/mydrive'}
+
+    def list_folder(index):
+        resp = drive.session.http_get('entry.cgi', params=params)
+        assert resp['data']['items'][0]['file_id'] == '42'
+        assert drive.list_folder('/mydrive')['success'] is True
+
+    assert run_threads(list_folder) == []
+    assert params == {'api': 'SYNO.SynologyDrive.Files', 'method': 'list', 'version': 2, 'path': '/mydrive'}
+    assert nas.requests['SYNO.SynologyDrive.Files.list'] == 2 * THREAD_COUNT
+
+
+def test_label_cache_filled_once(nas, drive):
+    drive.login()
+
+    def use_labels(index):
+        assert drive.label_dict['existing'] == '1'
+        drive.set_label_dict(f"label_{index}", str(index))
+        # readers always get a complete dict
+        label_dict = drive.label_dict
+        assert label_dict['existing'] == '1'
+        assert label_dict[f"label_{index}"] == str(index)
+
+    assert run_threads(use_labels) == []
+    assert nas.requests['SYNO.SynologyDrive.Labels.list'] == 1
+    assert len(drive.label_dict) == THREAD_COUNT + 1
+
+
+def test_dedup_counters(nas, drive):
+    drive.login()
+    content = b'x' * FILE_SIZE
+    drive.upload_index['/mydrive/a.txt'] = {'hash': hashlib.sha256(content).hexdigest(), 'size': FILE_SIZE,
+                                            'file_id': '42', 'modified_time': FILE_MODIFIED_TIME}
+
+    def upload(index):
+        file = io.BytesIO(content)
+        file.name = 'a.txt'
+        assert drive.upload_file(file, '/mydrive', dedup=True)['data']['file_id'] == '42'
+
+    assert run_threads(upload) == []
+    assert drive.dedup_skipped_files == THREAD_COUNT
+    assert drive.dedup_skipped_bytes == THREAD_COUNT * FILE_SIZE
+    assert 'SYNO.SynologyDrive.Files.upload' not in nas.requests
+
+
+def test_concurrent_relogin_keeps_sid(nas, drive):
+    drive.session.resume('expired-sid')
+    seen = []
+
+    def relogin(index):
+        # sid is replaced, never dropped while logging in
+        seen.append(drive.session.sid)
+        drive.relogin('expired-sid')
+        seen.append(drive.session.sid)
+
+    assert run_threads(relogin) == []
+    assert nas.requests['SYNO.API.Auth.login'] == 1
+    assert set(seen) <= {'expired-sid', SID}
+    assert drive.session.sid == SID